@@ -34,6 +34,53 @@ COREPLUS_DEFAULTS: Dict[str, Any] = {
     "HOOK_FILE_NAME": "corehooks",
     "REQUIRED_ADDRESS_FIELDS": [],
 
+    # Hook Settings
+    # ===================================================================
+    # JSON file caching which apps define HOOK_FILE_NAME, e.g. in the
+    # build directory, None scans the apps on every start
+    "HOOK_INDEX_FILE": None,
+    "HOOK_INSTRUMENTATION": False,
+    # Threads running sync hooks in run_hooks_concurrently()
+    "HOOK_MAX_WORKERS": 8,
+    "HOOK_METRICS_SINK": "coreplus.hooks.metrics.LoggingSink",
+    # Durations kept per hook function to compute the p95
+    "HOOK_METRICS_SAMPLES": 1000,
+    "HOOK_STATSD_HOST": "127.0.0.1",
+    "HOOK_STATSD_PORT": 8125,
+    "HOOK_STATSD_PREFIX": "coreplus.hooks",
+
+    # Numerator Settings
+    # ===================================================================
+    "NUMERATOR_CACHE_SIZE": 1024,
+
+    # Spam Filter Settings
+    # ===================================================================
+    "SPAM_MODEL_DIR": None,
+    "SPAM_MODEL_MMAP": False,
+    "SPAM_LANGUAGE_ROUTER": "coreplus.spams.extras.LanguageRouter",
+    "SPAM_CACHE_SIZE": 4096,
+
+    # Markdown Settings
+    # ===================================================================
+    "MARKDOWN_CACHE": True,
+    "MARKDOWN_CACHE_ALIAS": "default",
+    "MARKDOWN_CACHE_TIMEOUT": 60 * 60 * 24,
+    "MARKDOWN_CACHE_SIZE": 512,
+    "MARKDOWN_CACHE_VERSION": "1",
+    "MARKDOWN_OEMBED_RESOLVER": "coreplus.markdown.plugins.twitter.OEmbedResolver",
+    "MARKDOWN_OEMBED_ENDPOINT": "https://publish.twitter.com/oembed?url={url}",
+    "MARKDOWN_OEMBED_CACHE_TIMEOUT": 60 * 60 * 24 * 30,
+
+    # Site Settings Cache
+    # ===================================================================
+    "SETTINGS_CACHE": True,
+    "SETTINGS_CACHE_ALIAS": "default",
+    "SETTINGS_CACHE_TIMEOUT": 60 * 60,
+    "SETTINGS_CACHE_SIZE": 256,
+    # Seconds a worker trusts its local copy, saves in other processes
+    # are seen once it expires
+    "SETTINGS_LOCAL_CACHE_TIMEOUT": 10,
+
     # API Settings
     # ===================================================================
     "DEFAULT_USER_SERIALIZER": "coreplus.api.endpoints.serializers.CorePlusUserSerializer",
@@ -119,7 +166,8 @@ COREPLUS_DEFAULTS: Dict[str, Any] = {
 
 # List of settings that may be in string import notation.
 IMPORT_STRINGS = [
-    "PRINT_VIEW_CLASS", "DEFAULT_USER_SERIALIZER",
+    "PRINT_VIEW_CLASS", "DEFAULT_USER_SERIALIZER", "SPAM_LANGUAGE_ROUTER",
+    "MARKDOWN_OEMBED_RESOLVER", "HOOK_METRICS_SINK",
 ]
 
 # List of settings that have been removed
@@ -3,34 +3,62 @@ from operator import itemgetter
 from django.contrib import admin
 from django.views.generic import TemplateView
 
-from .core import get_hooks
+from ..configs import coreplus_configs as configs
+from .core import get_hooks, get_import_timings
+from .metrics import get_function_name, hook_stats
 
 
 class HookRegistryView(TemplateView):
     template_name = "admin/coreplus_hooks/hooks_registry.html"
 
-    def build_hook_info(self, func, order):
+    def build_stats_info(self, stats):
+        if stats is None:
+            return None
+        return {
+            "calls": stats["calls"],
+            "total_ms": stats["total"] * 1000,
+            "p95_ms": stats["p95"] * 1000,
+        }
+
+    def build_hook_info(self, func, order, stats=None):
         info = {
             "order": order,
             "module": func.__module__,
             "function": func.__name__,
             "documentation": func.__doc__,
+            "stats": self.build_stats_info(stats),
         }
         return info
 
     def get_hooks_data(self):
         hooks_data = dict()
+        function_stats = hook_stats.get_function_stats()
         for name, hooks in get_hooks().items():
             hooks_data[name] = [
-                self.build_hook_info(*func) for func in sorted(hooks, key=itemgetter(1))
+                self.build_hook_info(
+                    func, order, function_stats.get((name, get_function_name(func)))
+                )
+                for func, order in sorted(hooks, key=itemgetter(1))
             ]
         return hooks_data
 
+    def get_hook_stats_data(self):
+        return {
+            name: self.build_stats_info(stats)
+            for name, stats in hook_stats.get_hook_stats().items()
+        }
+
     def get_context_data(self, **kwargs):
         kwargs.update(
             {
                 "title": "Coreplus Hooks Registry",
                 "hook_list": self.get_hooks_data(),
+                "hook_stats": self.get_hook_stats_data(),
+                "instrumentation": configs.HOOK_INSTRUMENTATION,
+                "import_timings": {
+                    module: duration * 1000
+                    for module, duration in get_import_timings().items()
+                },
                 **admin.site.each_context(self.request),
             }
         )
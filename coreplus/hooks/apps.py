@@ -10,7 +10,11 @@ class CorePlusHookConfig(AppConfig):
     verbose_name = _("Hook")
 
     def ready(self):
+        from .core import search_for_corehook
+
         post_migrate.connect(init_app, sender=self)
+        # Import the corehooks modules at startup, not on the first request
+        search_for_corehook()
 
 
 def init_app(sender, **kwargs):
@@ -1,13 +1,40 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from importlib import import_module
 from operator import itemgetter
+from types import MappingProxyType
 
 from django.apps import apps
+from django.db import close_old_connections
 from django.utils.module_loading import module_has_submodule
 
+from asgiref.sync import async_to_sync
+
 from ..configs import coreplus_configs as configs
+from .indexes import read_index, write_index
+from .metrics import instrument
+
+logger = logging.getLogger("coreplus.hooks")
 
 _corehook = {}
 _searched_for_corehook = False
+_search_lock = threading.RLock()
+
+# {module name: seconds} spent importing each corehooks module
+_import_timings = {}
+
+# Frozen {hook_name: (fn, ...)} built from _corehook, dropped by register()
+_dispatch_table = None
+_dispatch_table_instrumented = False
+_dispatch_table_lock = threading.Lock()
+
+# Bounded pool running the sync hooks of run_hooks_concurrently()
+_executor = None
+_executor_lock = threading.Lock()
 
 
 def get_app_modules():
@@ -62,24 +89,167 @@ def register(hook_name, fn=None, order=0):
             "hook_name '%s' for '%s' should be str, or list!" % (hook_name, fn.__name__)
         )
 
-    for name in hook_names:
-        if name not in _corehook:
-            _corehook[name] = []
-        _corehook[name].append((fn, order))
+    global _dispatch_table
+    with _dispatch_table_lock:
+        for name in hook_names:
+            if name not in _corehook:
+                _corehook[name] = []
+            _corehook[name].append((fn, order))
+        _dispatch_table = None
+
+
+def find_corehook_apps(submodule_name):
+    """Return the names of the installed apps having ``submodule_name``"""
+    return [
+        name
+        for name, module in get_app_modules()
+        if module_has_submodule(module, submodule_name)
+    ]
+
+
+def import_corehook(app_name, submodule_name):
+    """Import the hooks module of ``app_name`` and record how long it took"""
+    module_name = "%s.%s" % (app_name, submodule_name)
+    start = time.perf_counter()
+    module = import_module(module_name)
+    _import_timings[module_name] = duration = time.perf_counter() - start
+    logger.debug("Imported %s in %.2fms", module_name, duration * 1000)
+    return module
+
+
+def get_import_timings():
+    """Return a {module name: seconds} dict of the corehooks imports"""
+    return dict(_import_timings)
 
 
 def search_for_corehook():
+    """
+    Import the corehooks module of every installed app, once. It runs in
+    ``AppConfig.ready()``, the apps having hooks are read from the
+    HOOK_INDEX_FILE index when it is set and still valid.
+    """
     global _searched_for_corehook
-    if not _searched_for_corehook:
-        list(get_app_submodules(configs.HOOK_FILE_NAME))
+    if _searched_for_corehook:
+        return
+    with _search_lock:
+        if _searched_for_corehook:
+            return
+        file_name = configs.HOOK_FILE_NAME
+        index_path = configs.HOOK_INDEX_FILE
+        app_names = read_index(index_path, file_name) if index_path else None
+        if app_names is None:
+            app_names = find_corehook_apps(file_name)
+            if index_path:
+                write_index(index_path, file_name, app_names)
+        for app_name in app_names:
+            import_corehook(app_name, file_name)
         _searched_for_corehook = True
 
 
+def build_dispatch_table(instrumented=False):
+    table = {}
+    for name, hooks in _corehook.items():
+        fns = [hook[0] for hook in sorted(hooks, key=itemgetter(1))]
+        if instrumented:
+            fns = [instrument(name, fn) for fn in fns]
+        table[name] = tuple(fns)
+    return MappingProxyType(table)
+
+
+def get_dispatch_table():
+    """
+    Return the read only {hook_name: (fn, ...)} mapping of hook functions
+    sorted by their order, it is built once after the corehooks search.
+    With HOOK_INSTRUMENTATION the functions are wrapped to record calls.
+    """
+    global _dispatch_table, _dispatch_table_instrumented
+    search_for_corehook()
+    instrumented = configs.HOOK_INSTRUMENTATION
+    table = _dispatch_table
+    if table is not None and _dispatch_table_instrumented == instrumented:
+        return table
+    with _dispatch_table_lock:
+        if _dispatch_table is None or _dispatch_table_instrumented != instrumented:
+            _dispatch_table = build_dispatch_table(instrumented)
+            _dispatch_table_instrumented = instrumented
+        return _dispatch_table
+
+
 def get_hooks(hook_name=None):
     """Return the hooks function sorted by their order."""
-    search_for_corehook()
     if hook_name is None:
+        search_for_corehook()
         return _corehook
-    hooks = _corehook.get(hook_name, [])
-    hooks = sorted(hooks, key=itemgetter(1))
-    return [hook[0] for hook in hooks]
+    return get_dispatch_table().get(hook_name, ())
+
+
+def run_hooks(hook_name, *args, **kwargs):
+    """
+    Call each hook of ``hook_name`` once, in order, and return the list
+    of their results that are not None.
+    """
+    results = []
+    for fn in get_hooks(hook_name):
+        if asyncio.iscoroutinefunction(fn):
+            result = async_to_sync(fn)(*args, **kwargs)
+        else:
+            result = fn(*args, **kwargs)
+        if result is not None:
+            results.append(result)
+    return results
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=configs.HOOK_MAX_WORKERS,
+                thread_name_prefix="coreplus-hooks",
+            )
+        return _executor
+
+
+def run_pooled_hook(fn, *args, **kwargs):
+    """
+    Run a sync hook in a pool thread, the connections it opened are
+    closed afterwards when they are past CONN_MAX_AGE or unusable, as
+    Django does at the end of a request.
+    """
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def arun_hooks_concurrently(hook_name, *args, **kwargs):
+    """
+    Run the hooks of ``hook_name`` concurrently, ``async def`` hooks on the
+    running event loop and the others in a bounded thread pool. Returns
+    the results that are not None in hook order.
+
+    Pooled hooks use their own database connections, so they don't see
+    the caller's open transaction, its uncommitted rows included.
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    awaitables = []
+    for fn in get_hooks(hook_name):
+        if asyncio.iscoroutinefunction(fn):
+            awaitables.append(fn(*args, **kwargs))
+        else:
+            awaitables.append(
+                loop.run_in_executor(
+                    executor, partial(run_pooled_hook, fn, *args, **kwargs)
+                )
+            )
+    results = await asyncio.gather(*awaitables)
+    return [result for result in results if result is not None]
+
+
+def run_hooks_concurrently(hook_name, *args, **kwargs):
+    """
+    Synchronous version of :func:`arun_hooks_concurrently`, I/O bound hooks
+    then take as long as the slowest one instead of the sum of them all.
+    """
+    return async_to_sync(arun_hooks_concurrently)(hook_name, *args, **kwargs)
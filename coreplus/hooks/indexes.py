@@ -0,0 +1,58 @@
+"""
+Cached index of the installed apps that define a corehooks module.
+
+The index is a JSON file holding the installed apps, the mtime of each app
+directory and the apps that have hooks. It is valid as long as the app list,
+HOOK_FILE_NAME and every directory mtime match, adding or removing a hook
+module changes the mtime of its app directory.
+"""
+
+import json
+import logging
+import os
+
+from django.apps import apps
+
+logger = logging.getLogger("coreplus.hooks")
+
+
+def get_app_mtimes():
+    mtimes = {}
+    for app in apps.get_app_configs():
+        try:
+            mtimes[app.name] = os.stat(app.path).st_mtime
+        except OSError:
+            mtimes[app.name] = None
+    return mtimes
+
+
+def get_index_state(file_name):
+    return {"file_name": file_name, "mtimes": get_app_mtimes()}
+
+
+def read_index(path, file_name):
+    """
+    Return the app names of a valid index at ``path``, None when it is
+    missing, unreadable or stale.
+    """
+    try:
+        with open(path) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    state = get_index_state(file_name)
+    if index.get("state") != json.loads(json.dumps(state)):
+        logger.debug("Hook index %s is stale", path)
+        return None
+    return index.get("apps")
+
+
+def write_index(path, file_name, app_names):
+    index = {"state": get_index_state(file_name), "apps": list(app_names)}
+    tmp_path = "%s.%s.tmp" % (path, os.getpid())
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        logger.warning("Could not write hook index %s: %s", path, exc)
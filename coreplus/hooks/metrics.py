@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import math
+import re
+import socket
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+from ..configs import coreplus_configs as configs
+
+logger = logging.getLogger("coreplus.hooks")
+
+
+def percentile(values, percent):
+    """Nearest rank percentile of an already sorted list"""
+    if not values:
+        return 0.0
+    rank = max(math.ceil(percent / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+def get_function_name(fn):
+    return "%s.%s" % (fn.__module__, getattr(fn, "__qualname__", fn.__name__))
+
+
+class BaseSink:
+    """Receives every hook call duration, in seconds"""
+
+    def emit(self, hook_name, function, duration):
+        raise NotImplementedError
+
+
+class LoggingSink(BaseSink):
+    def emit(self, hook_name, function, duration):
+        logger.debug("hook %s %s %.3fms", hook_name, function, duration * 1000)
+
+
+class StatsdSink(BaseSink):
+    """
+    Send each call as a statsd timing, ``<prefix>.<hook_name>.<function>``,
+    over UDP to HOOK_STATSD_HOST:HOOK_STATSD_PORT.
+    """
+
+    def __init__(self, host=None, port=None, prefix=None):
+        self.host = host or configs.HOOK_STATSD_HOST
+        self.port = port or configs.HOOK_STATSD_PORT
+        self.prefix = configs.HOOK_STATSD_PREFIX if prefix is None else prefix
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def get_metric_name(self, *parts):
+        parts = [re.sub(r"[^\w-]", "_", part) for part in parts]
+        return ".".join([self.prefix, *parts] if self.prefix else parts)
+
+    def emit(self, hook_name, function, duration):
+        name = self.get_metric_name(hook_name, function)
+        data = "%s:%.3f|ms" % (name, duration * 1000)
+        try:
+            self.socket.sendto(data.encode("utf-8"), (self.host, self.port))
+        except OSError as exc:
+            logger.warning("Could not send hook metric %s: %s", name, exc)
+
+
+class HookStats:
+    """
+    Call counts, cumulative duration and the most recent durations of each
+    (hook_name, function), shared by all threads of the process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}
+
+    def record(self, hook_name, function, duration):
+        with self._lock:
+            try:
+                entry = self._data[(hook_name, function)]
+            except KeyError:
+                entry = self._data[(hook_name, function)] = {
+                    "calls": 0,
+                    "total": 0.0,
+                    "durations": deque(maxlen=configs.HOOK_METRICS_SAMPLES),
+                }
+            entry["calls"] += 1
+            entry["total"] += duration
+            entry["durations"].append(duration)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def summarize(self, entries):
+        durations = sorted(d for entry in entries for d in entry["durations"])
+        return {
+            "calls": sum(entry["calls"] for entry in entries),
+            "total": sum(entry["total"] for entry in entries),
+            "p95": percentile(durations, 95),
+        }
+
+    def get_function_stats(self):
+        """Return a {(hook_name, function): summary} dict"""
+        with self._lock:
+            return {key: self.summarize([entry]) for key, entry in self._data.items()}
+
+    def get_hook_stats(self):
+        """Return a {hook_name: summary} dict over all functions of a hook"""
+        with self._lock:
+            grouped = {}
+            for (hook_name, function), entry in self._data.items():
+                grouped.setdefault(hook_name, []).append(entry)
+            return {name: self.summarize(entries) for name, entries in grouped.items()}
+
+
+hook_stats = HookStats()
+
+_sink = None
+_sink_key = None
+
+
+def get_sink():
+    """Return the HOOK_METRICS_SINK instance, rebuilt when settings change"""
+    global _sink, _sink_key
+    key = (
+        configs.HOOK_METRICS_SINK,
+        configs.HOOK_STATSD_HOST,
+        configs.HOOK_STATSD_PORT,
+        configs.HOOK_STATSD_PREFIX,
+    )
+    if key != _sink_key:
+        sink_class = configs.HOOK_METRICS_SINK
+        _sink = sink_class() if sink_class is not None else None
+        _sink_key = key
+    return _sink
+
+
+def record(hook_name, fn, duration):
+    function = get_function_name(fn)
+    hook_stats.record(hook_name, function, duration)
+    sink = get_sink()
+    if sink is not None:
+        sink.emit(hook_name, function, duration)
+
+
+def instrument(hook_name, fn):
+    """Wrap ``fn`` so every call of it as ``hook_name`` is recorded"""
+
+    if asyncio.iscoroutinefunction(fn):
+
+        @wraps(fn)
+        async def ainner(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                record(hook_name, fn, time.perf_counter() - start)
+
+        return ainner
+
+    @wraps(fn)
+    def inner(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            record(hook_name, fn, time.perf_counter() - start)
+
+    return inner
@@ -0,0 +1,193 @@
+import asyncio
+import json
+import os
+import socket
+import tempfile
+import time
+from unittest import mock
+
+from django.apps import apps
+from django.test import SimpleTestCase, tag
+
+from . import core, indexes
+from .admin import HookRegistryView
+from .metrics import get_function_name, hook_stats
+
+
+class HookTestCase(SimpleTestCase):
+    hook_name = "COREPLUS_TEST_HOOK"
+
+    def tearDown(self):
+        core._corehook.pop(self.hook_name, None)
+        core._dispatch_table = None
+
+    @tag("hooks_unit_test")
+    def test_get_hooks_is_sorted_and_cached(self):
+        calls = []
+
+        @core.register(self.hook_name, order=10)
+        def last(value):
+            calls.append("last")
+            return None
+
+        @core.register(self.hook_name, order=-1)
+        def first(value):
+            calls.append("first")
+            return value + 1
+
+        hooks = core.get_hooks(self.hook_name)
+        self.assertEqual(hooks, (first, last))
+        self.assertIs(core.get_hooks(self.hook_name), hooks)
+        self.assertEqual(core.get_hooks("COREPLUS_MISSING_HOOK"), ())
+
+        # A late registration rebuilds the table
+        @core.register(self.hook_name)
+        def middle(value):
+            calls.append("middle")
+            return value * 2
+
+        self.assertEqual(core.get_hooks(self.hook_name), (first, middle, last))
+        self.assertEqual(core.run_hooks(self.hook_name, 2), [3, 4])
+        self.assertEqual(calls, ["first", "middle", "last"])
+
+
+class HookMetricsTestCase(SimpleTestCase):
+    hook_name = "COREPLUS_TEST_METRICS_HOOK"
+
+    def setUp(self):
+        hook_stats.clear()
+
+    def tearDown(self):
+        core._corehook.pop(self.hook_name, None)
+        core._dispatch_table = None
+        hook_stats.clear()
+
+    @tag("hooks_unit_test")
+    def test_instrumentation(self):
+        @core.register(self.hook_name)
+        def slow(value):
+            time.sleep(0.01)
+            return value
+
+        self.assertIs(core.get_hooks(self.hook_name)[0], slow)
+        with self.settings(
+            COREPLUS={"HOOK_INSTRUMENTATION": True, "HOOK_METRICS_SINK": None}
+        ):
+            self.assertEqual(core.run_hooks(self.hook_name, 1), [1])
+            self.assertEqual(core.run_hooks(self.hook_name, 2), [2])
+
+        stats = hook_stats.get_function_stats()[
+            (self.hook_name, get_function_name(slow))
+        ]
+        self.assertEqual(stats["calls"], 2)
+        self.assertGreaterEqual(stats["total"], 0.02)
+        self.assertGreaterEqual(stats["p95"], 0.01)
+        self.assertEqual(hook_stats.get_hook_stats()[self.hook_name]["calls"], 2)
+        self.assertIs(core.get_hooks(self.hook_name)[0], slow)
+
+        view = HookRegistryView()
+        self.assertEqual(view.get_hooks_data()[self.hook_name][0]["stats"]["calls"], 2)
+        self.assertEqual(view.get_hook_stats_data()[self.hook_name]["calls"], 2)
+
+    @tag("hooks_unit_test")
+    def test_statsd_sink(self):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        listener.bind(("127.0.0.1", 0))
+        listener.settimeout(5)
+        self.addCleanup(listener.close)
+
+        core.register(self.hook_name, lambda: "done")
+        with self.settings(
+            COREPLUS={
+                "HOOK_INSTRUMENTATION": True,
+                "HOOK_METRICS_SINK": "coreplus.hooks.metrics.StatsdSink",
+                "HOOK_STATSD_PORT": listener.getsockname()[1],
+            }
+        ):
+            self.assertEqual(core.run_hooks(self.hook_name), ["done"])
+        data = listener.recv(1024).decode("utf-8")
+        self.assertRegex(
+            data,
+            r"^coreplus\.hooks\.COREPLUS_TEST_METRICS_HOOK\."
+            r"coreplus_hooks_tests_[\w]+:[\d.]+\|ms$",
+        )
+
+
+class HookConcurrencyTestCase(SimpleTestCase):
+    hook_name = "COREPLUS_TEST_ASYNC_HOOK"
+
+    def tearDown(self):
+        core._corehook.pop(self.hook_name, None)
+        core._dispatch_table = None
+
+    def register_hooks(self):
+        @core.register(self.hook_name, order=2)
+        async def fetch(value):
+            await asyncio.sleep(0.2)
+            return "async %s" % value
+
+        @core.register(self.hook_name, order=1)
+        def lookup(value):
+            time.sleep(0.2)
+            return "sync %s" % value
+
+        @core.register(self.hook_name, order=3)
+        def skipped(value):
+            return None
+
+    @tag("hooks_unit_test")
+    def test_run_hooks_concurrently(self):
+        self.register_hooks()
+        start = time.perf_counter()
+        with mock.patch.object(core, "close_old_connections") as close:
+            results = core.run_hooks_concurrently(self.hook_name, 1)
+        self.assertLess(time.perf_counter() - start, 0.35)
+        self.assertEqual(results, ["sync 1", "async 1"])
+        # Each pooled sync hook releases its connections
+        self.assertEqual(close.call_count, 2)
+
+        # Sequential runs await async hooks too
+        self.assertEqual(core.run_hooks(self.hook_name, 2), ["sync 2", "async 2"])
+        with self.settings(
+            COREPLUS={"HOOK_INSTRUMENTATION": True, "HOOK_METRICS_SINK": None}
+        ):
+            results = asyncio.run(core.arun_hooks_concurrently(self.hook_name, 3))
+        self.assertEqual(results, ["sync 3", "async 3"])
+
+
+class HookDiscoveryTestCase(SimpleTestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.index_path = os.path.join(tmp_dir.name, "hooks.json")
+        self.addCleanup(setattr, core, "_searched_for_corehook", True)
+
+    def search(self):
+        core._searched_for_corehook = False
+        with self.settings(COREPLUS={"HOOK_INDEX_FILE": self.index_path}):
+            with mock.patch.object(
+                core, "find_corehook_apps", wraps=core.find_corehook_apps
+            ) as find:
+                core.search_for_corehook()
+        return find
+
+    @tag("hooks_unit_test")
+    def test_discovery_in_ready(self):
+        core._searched_for_corehook = False
+        with mock.patch.dict(core._import_timings, clear=True):
+            apps.get_app_config("coreplus_hooks").ready()
+            self.assertTrue(core._searched_for_corehook)
+            self.assertIn("example.app.corehooks", core.get_import_timings())
+
+    @tag("hooks_unit_test")
+    def test_discovery_index(self):
+        self.search().assert_called_once()
+        with open(self.index_path) as f:
+            self.assertEqual(json.load(f)["apps"], ["example.app"])
+        self.search().assert_not_called()
+
+        # A changed app directory invalidates the index
+        with mock.patch.object(
+            indexes, "get_app_mtimes", return_value={"example.app": 0}
+        ):
+            self.search().assert_called_once()
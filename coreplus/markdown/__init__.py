@@ -1,14 +1,52 @@
 import logging
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import wraps
+from itertools import chain, islice
 
-import bleach
 import mistune
 
-from .bleaching import ALLOWED_ATTRIBUTES, ALLOWED_PROTOCOLS, ALLOWED_TAGS
-from .plugins import gist, twitter, youtube
+from ..utils.iterables import iter_chunks
+from .bleaching import get_cleaner, get_linker
+from .caches import cached_render
+from .embeds import embed_nonce, expand_embeds, filter_embeds, new_nonce
+from .registries import EMBED_RENDERERS, register_plugin, registry  # NOQA
 from .renderer import HTMLRenderer
 
 logger = logging.getLogger("engine")
 
+# Markdown instances keyed by (escape, plugins), a mistune Markdown keeps
+# its parse state per call so one instance can be shared across threads.
+_parsers = {}
+_parsers_lock = threading.Lock()
+
+
+def get_parser(escape=False, plugins=None):
+    """
+    Return the shared mistune Markdown instance for escape and plugins,
+    it is built on first use only.
+    """
+    plugins = tuple(registry.get_plugins() if plugins is None else plugins)
+    key = (escape, plugins)
+    try:
+        return _parsers[key]
+    except KeyError:
+        pass
+    with _parsers_lock:
+        if key not in _parsers:
+            _parsers[key] = mistune.create_markdown(
+                renderer=HTMLRenderer(escape=escape),
+                escape=escape,
+                plugins=list(plugins),
+            )
+        return _parsers[key]
+
+
+def clear_parsers():
+    with _parsers_lock:
+        _parsers.clear()
+
 
 def safe(f):
     """
@@ -27,108 +65,182 @@ def safe(f):
 
 
 def linkifier(text):
+    return get_linker().linkify(text)
+
+
+def sanitize(text):
+    """Sanitize and linkify html, html5lib parses it only once"""
+    return get_cleaner().clean(text)
+
+
+def postprocess(html, plugins, nonce, clean=True):
+    """
+    Sanitize and linkify rendered html, then drop the embed placeholders
+    not rendered with ``nonce`` by one of ``plugins``.
+    """
+    html = sanitize(html) if clean else linkifier(text=html)
+    return filter_embeds(html, nonce, registry.get_embed_names(plugins))
 
-    # List of links to embed
-    embed = []
 
-    html = bleach.linkify(
-        text=text,
-        callbacks=[
-            # we can add mention and tag link here
-            bleach.callbacks.nofollow,
-            bleach.callbacks.target_blank,
-        ],
-        skip_tags=["pre", "code"],
-    )
+def with_embeds(func):
+    """Expand the embed placeholders of the html returned by ``func``"""
 
-    # Embed links into html.
-    for em in embed:
-        source, target = em
-        emb = f'<a href="{source}" rel="nofollow">{source}</a>'
-        html = html.replace(emb, target)
-    return html
+    @wraps(func)
+    def inner(*args, **kwargs):
+        return expand_embeds(func(*args, **kwargs), EMBED_RENDERERS)
+
+    return inner
+
+
+def render(text, plugins, clean=True, escape=False):
+    """
+    Render markdown with ``plugins``, then sanitize and linkify the html
+    in one pass. Embeds are left as placeholders, see with_embeds().
+    """
+    markdown = get_parser(escape=escape, plugins=plugins)
+    with embed_nonce(new_nonce()) as nonce:
+        html = markdown(text)
+    return postprocess(html, plugins, nonce, clean=clean)
+
+
+def iter_blocks(text, plugins, escape=False, nonce=None):
+    """
+    Yields the html of each top level block, then the output of the
+    after render hooks, e.g. the footnotes. Embed placeholders carry
+    ``nonce``.
+    """
+    markdown = get_parser(escape=escape, plugins=plugins)
+    state = {}
+    text, state = markdown.before_parse(text, state)
+    tokens = markdown.block.parse(text, state)
+    tokens = markdown.before_render(tokens, state)
+    blocks = markdown.block._iter_render(tokens, markdown.inline, state)
+    while True:
+        # Set the nonce only while mistune renders, not across yields
+        with embed_nonce(nonce):
+            html = next(blocks, None)
+            if html is None:
+                html = markdown.after_render("", state)
+                blocks = None
+        yield html
+        if blocks is None:
+            return
+
+
+def stream(text, clean=True, escape=False, simple=False, chunk_size=8192):
+    """
+    Lazily yields the html of markdown ``text`` in chunks of whole blocks,
+    e.g. for a StreamingHttpResponse. Bleach only sees one chunk at a time
+    so memory peaks with the largest chunk instead of the whole document.
+    The render cache is not used.
+
+    chunk_size : Minimum length of a chunk, blocks are rendered until the
+                 pending html reaches it.
+    """
+    plugins = registry.get_plugins(simple=simple)
+    nonce = new_nonce()
+    pending = []
+    length = 0
+    for html in iter_blocks(text, plugins, escape=escape, nonce=nonce):
+        pending.append(html)
+        length += len(html)
+        if length >= chunk_size:
+            html = postprocess("".join(pending), plugins, nonce, clean=clean)
+            yield expand_embeds(html, EMBED_RENDERERS)
+            pending = []
+            length = 0
+    if pending:
+        html = postprocess("".join(pending), plugins, nonce, clean=clean)
+        yield expand_embeds(html, EMBED_RENDERERS)
 
 
 @safe
+@with_embeds
+@cached_render
 def parse(text, clean=True, escape=False):
     """
     Parses markdown into html.
     Expands certain patterns into HTML.
 
-    clean : Applies bleach clean BEFORE mistune escapes unsafe characters.
-            Also removes unbalanced tags at this stage.
+    clean : Applies bleach clean to the html rendered by mistune, links are
+            added in the same pass. Also removes unbalanced tags.
     escape  : Escape html originally found in the markdown text.
     allow_rewrite : Serve images with relative url paths from the static directory.
                   eg. images/foo.png -> /static/images/foo.png
     """
-
-    # Bleach clean the html.
-    if clean:
-        output = bleach.clean(
-            text=text,
-            tags=ALLOWED_TAGS,
-            attributes=ALLOWED_ATTRIBUTES,
-            protocols=ALLOWED_PROTOCOLS,
-        )
-
-    renderer = HTMLRenderer(escape=escape)
-    markdown = mistune.create_markdown(
-        renderer=renderer,
-        escape=escape,
-        plugins=[
-            gist.plugin_gist,
-            twitter.plugin_twitter,
-            youtube.plugin_youtube,
-            "strikethrough",
-            "footnotes",
-            "table",
-        ],
-    )
-    output = markdown(output)
-
-    # Embed sensitive links into html
-    output = linkifier(text=output)
-
-    return output
+    return render(text, registry.get_plugins(), clean=clean, escape=escape)
 
 
 @safe
+@with_embeds
+@cached_render
 def parse_simple(text, clean=True, escape=False):
     """
     Parses markdown into html.
     Expands certain patterns into HTML.
 
-    clean : Applies bleach clean BEFORE mistune escapes unsafe characters.
-            Also removes unbalanced tags at this stage.
+    clean : Applies bleach clean to the html rendered by mistune, links are
+            added in the same pass. Also removes unbalanced tags.
     escape  : Escape html originally found in the markdown text.
     """
+    return render(text, registry.get_plugins(simple=True), clean=clean, escape=escape)
+
 
-    # Bleach clean the html.
-    if clean:
-        output = bleach.clean(
-            text=text,
-            tags=ALLOWED_TAGS,
-            # styles=ALLOWED_STYLES,
-            attributes=ALLOWED_ATTRIBUTES,
-            protocols=ALLOWED_PROTOCOLS,
-        )
-
-    renderer = HTMLRenderer(escape=escape)
-    markdown = mistune.create_markdown(
-        renderer=renderer,
-        escape=escape,
-        plugins=[
-            "strikethrough",
-            "footnotes",
-            "table",
-        ],
-    )
-    output = markdown(output)
-
-    # Embed sensitive links into html
-    output = linkifier(text=output)
-
-    return output
+def _init_worker(simple, escape):
+    import django
+    from django.apps import apps
+
+    # Spawned workers start without django, forked ones inherit it
+    if not apps.ready:
+        django.setup()
+
+    # Build the parser and cleaner once per worker process
+    get_parser(escape=escape, plugins=registry.get_plugins(simple=simple))
+    get_cleaner()
+
+
+def _render_chunk(chunk, simple, clean, escape, cache):
+    func = parse_simple if simple else parse
+    return [func(text, clean=clean, escape=escape, cache=cache) for text in chunk]
+
+
+def render_many(
+    texts,
+    workers=None,
+    chunk_size=100,
+    simple=False,
+    clean=True,
+    escape=False,
+    cache=True,
+):
+    """
+    Lazily yields the html of each markdown text, in order. With more than
+    one worker, chunks are fanned out over a process pool with a bounded
+    number of chunks in flight, batches of a single chunk are rendered
+    in process.
+    """
+    func = parse_simple if simple else parse
+    chunks = iter_chunks(texts, chunk_size)
+    head = list(islice(chunks, 2))
+    chunks = chain(head, chunks)
+    if not workers or workers <= 1 or len(head) < 2:
+        for chunk in chunks:
+            for text in chunk:
+                yield func(text, clean=clean, escape=escape, cache=cache)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(simple, escape)
+    ) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(
+                executor.submit(_render_chunk, chunk, simple, clean, escape, cache)
+            )
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
 
 
 def parse_attachment(text, clean=True, escape=True):
@@ -0,0 +1,137 @@
+"""
+Benchmark markdown rendering stage by stage.
+
+The corpus holds small, medium and huge documents mixing tables, footnotes,
+links and gist/youtube/twitter embeds. Every stage is timed over ``repeat``
+runs, then run once more under tracemalloc to record the allocated bytes.
+The ``plugin.*`` stages render with the base plugins plus one embed plugin,
+compare them with ``mistune.base`` to get the cost of that plugin.
+"""
+
+import time
+import tracemalloc
+
+from . import get_parser, linkifier, parse, parse_simple, sanitize
+from .embeds import expand_embeds
+from .plugins import gist, twitter, youtube
+from .registries import BASE_PLUGINS, EMBED_RENDERERS, registry
+
+SECTION = """
+## Section {i}
+
+Some *emphasis*, **strong** and ~~deleted~~ text with a footnote[^{i}], see
+https://www.coreplus.co.id/p/{i} or [the docs](https://docs.coreplus.co.id/{i})
+and www.example.com/{i}.
+
+| Name | Qty | Price |
+|:-----|:---:|------:|
+| item {i} | {i} | 10.00 |
+| other {i} | 2 | 2.50 |
+
+```
+print({i})
+http://www.psu.edu/{i}
+```
+
+https://www.youtube.com/watch?v=Hc8QdwfYFT8
+
+https://twitter.com/Linux/status/{i}
+
+https://gist.github.com/justsasri/a23c13b7d6e5a46f473a4f57673e9970
+
+[^{i}]: Footnote {i} https://www.coreplus.co.id/f/{i}
+"""
+
+SMALL = "Hello **world**, visit https://www.coreplus.co.id/p/1 [home](/)."
+
+# Number of sections of each document size
+CORPUS_SIZES = {"small": 0, "medium": 10, "huge": 200}
+
+
+def build_corpus(sizes=None):
+    """Return a {size: markdown} dict of generated documents"""
+    sizes = sizes or list(CORPUS_SIZES)
+    corpus = {}
+    for size in sizes:
+        count = CORPUS_SIZES[size]
+        if not count:
+            corpus[size] = SMALL
+        else:
+            corpus[size] = "\n".join(SECTION.format(i=i) for i in range(count))
+    return corpus
+
+
+def get_stages(text):
+    """
+    Return a {name: callable} dict of the rendering stages of ``text``, the
+    inputs of the later stages are rendered up front.
+    """
+    plugins = registry.get_plugins()
+    html = get_parser(plugins=plugins)(text)
+    cleaned = sanitize(html)
+
+    def plugin_stage(plugin):
+        parser = get_parser(plugins=BASE_PLUGINS + [plugin])
+        return lambda: parser(text)
+
+    return {
+        "parse": lambda: parse(text, cache=False),
+        "parse_simple": lambda: parse_simple(text, cache=False),
+        "mistune": lambda: get_parser(plugins=plugins)(text),
+        "mistune.base": lambda: get_parser(plugins=BASE_PLUGINS)(text),
+        "bleach.clean": lambda: sanitize(html),
+        "bleach.linkify": lambda: linkifier(html),
+        "embeds.expand": lambda: expand_embeds(cleaned, EMBED_RENDERERS),
+        "plugin.gist": plugin_stage(gist.plugin_gist),
+        "plugin.youtube": plugin_stage(youtube.plugin_youtube),
+        "plugin.twitter": plugin_stage(twitter.plugin_twitter),
+    }
+
+
+def measure(func, repeat=5):
+    """
+    Return timings in seconds and tracemalloc allocations in bytes of
+    calling ``func``, allocations are measured on a separate run.
+    """
+    func()  # warm up, e.g. parsers and the bleach cleaner
+    timings = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    # Trace the run alone, the peak can't be reset before Python 3.9
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.stop()
+    tracemalloc.start()
+    try:
+        func()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        if tracing:
+            tracemalloc.start()
+
+    return {
+        "min": min(timings) if timings else 0.0,
+        "mean": sum(timings) / len(timings) if timings else 0.0,
+        "peak": peak,
+        "retained": current,
+    }
+
+
+def run_benchmark(sizes=None, stages=None, repeat=5):
+    """
+    Measure each stage against each document of the corpus, returns a list
+    of result dicts in corpus then stage order.
+    """
+    results = []
+    for size, text in build_corpus(sizes).items():
+        for name, func in get_stages(text).items():
+            if stages and name not in stages:
+                continue
+            result = measure(func, repeat=repeat)
+            result.update(size=size, stage=name, length=len(text))
+            results.append(result)
+    return results
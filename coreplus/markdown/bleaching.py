@@ -1,12 +1,25 @@
+import re
+import threading
+from functools import partial
+
 import bleach
+from bleach.html5lib_shim import HTML_TAGS
+from bleach.linkifier import LinkifyFilter
+
+from .embeds import EMBED_TAG
 
 ALLOWED_ATTRIBUTES = {
     "*": ["class", "style"],
-    "a": ["href", "rel"],
-    "img": ["src", "alt", "width", "height"],
+    "a": ["href", "rel", "title"],
+    "img": ["src", "alt", "title", "width", "height"],
     "table": ["border", "cellpadding", "cellspacing"],
+    EMBED_TAG: ["data-name", "data-uid", "data-nonce"],
 }
 
+# Footnotes link to these ids, other ids are removed
+FOOTNOTE_ID_TAGS = ["li", "sup"]
+FOOTNOTE_ID_PATTERN = re.compile(r"^fn(ref)?-[\w-]+$")
+
 ALLOWED_TAGS = [
     "p",
     "div",
@@ -17,6 +30,8 @@ ALLOWED_TAGS = [
     "h2",
     "h3",
     "h4",
+    "h5",
+    "h6",
     "hr",
     "span",
     "s",
@@ -39,13 +54,107 @@ ALLOWED_TAGS = [
     "del",
     "details",
     "summary",
+    "section",
+    EMBED_TAG,
 ]
 ALLOWED_TAGS = set(ALLOWED_TAGS).union(bleach.ALLOWED_TAGS)
 
 ALLOWED_PROTOCOLS = ["ftp", "http"]
 ALLOWED_PROTOCOLS = set(ALLOWED_PROTOCOLS).union(bleach.ALLOWED_PROTOCOLS)
 
-ALLOWED_STYLES = ["color", "font-weight", "background-color", "width height"]
+ALLOWED_STYLES = [
+    "color",
+    "font-weight",
+    "background-color",
+    "width",
+    "height",
+    "text-align",
+]
+
+# Inline styles kept by StyleSanitizer, the alignment of table cells
+TABLE_STYLES = ["text-align"]
+
+LINKIFY_CALLBACKS = [
+    # we can add mention and tag link here
+    bleach.callbacks.nofollow,
+    bleach.callbacks.target_blank,
+]
+LINKIFY_SKIP_TAGS = ["pre", "code"]
+
+STYLE_VALUE_PATTERN = re.compile(r"^[#\w\s.,%-]+$")
+
+
+class StyleSanitizer:
+    """
+    Keep the ``allowed_styles`` declarations of plain values, the
+    ``text-align`` of table cells by default. bleach empties style
+    attributes when no css sanitizer is given.
+    """
+
+    def __init__(self, allowed_styles=None):
+        allowed_styles = TABLE_STYLES if allowed_styles is None else allowed_styles
+        self.allowed_styles = frozenset(allowed_styles)
+
+    def sanitize_css(self, style):
+        declarations = []
+        for declaration in style.split(";"):
+            name, sep, value = declaration.partition(":")
+            name, value = name.strip().lower(), value.strip()
+            if not sep or name not in self.allowed_styles:
+                continue
+            if STYLE_VALUE_PATTERN.match(value):
+                declarations.append("%s:%s" % (name, value))
+        return ";".join(declarations)
+
+
+def allow_attribute(tag, name, value):
+    """ALLOWED_ATTRIBUTES filter, ids are only kept for footnotes"""
+    if name == "id":
+        return tag in FOOTNOTE_ID_TAGS and bool(FOOTNOTE_ID_PATTERN.match(value))
+    return name in ALLOWED_ATTRIBUTES.get(tag, ()) or name in ALLOWED_ATTRIBUTES["*"]
+
+
+# bleach cleaners and linkers are not thread safe, build one per thread
+_local = threading.local()
+
+
+def get_cleaner():
+    """
+    Return this thread's Cleaner, it sanitizes and linkifies the html
+    in a single html5lib pass.
+    """
+    try:
+        return _local.cleaner
+    except AttributeError:
+        pass
+    _local.cleaner = bleach.Cleaner(
+        tags=ALLOWED_TAGS,
+        attributes=allow_attribute,
+        protocols=ALLOWED_PROTOCOLS,
+        css_sanitizer=StyleSanitizer(),
+        filters=[
+            partial(
+                LinkifyFilter,
+                callbacks=LINKIFY_CALLBACKS,
+                skip_tags=LINKIFY_SKIP_TAGS,
+            )
+        ],
+    )
+    return _local.cleaner
+
+
+def get_linker():
+    """Return this thread's Linker, used when the html is not cleaned"""
+    try:
+        return _local.linker
+    except AttributeError:
+        pass
+    _local.linker = bleach.Linker(
+        callbacks=LINKIFY_CALLBACKS,
+        skip_tags=LINKIFY_SKIP_TAGS,
+        recognized_tags=HTML_TAGS | {EMBED_TAG},
+    )
+    return _local.linker
 
 
 def embedder(attrs, new, targets=None, embed=None):
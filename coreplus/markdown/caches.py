@@ -0,0 +1,108 @@
+import hashlib
+import logging
+from functools import wraps
+
+from django.core.cache import caches
+from django.test.signals import setting_changed
+
+from ..configs import coreplus_configs as configs
+from ..utils.caches import LRUCache
+from .bleaching import ALLOWED_ATTRIBUTES, ALLOWED_PROTOCOLS, ALLOWED_TAGS
+from .registries import registry
+
+logger = logging.getLogger("engine")
+
+
+def get_cache_size():
+    return configs.MARKDOWN_CACHE_SIZE
+
+
+# Local tier in front of the Django cache backend
+render_cache = LRUCache(get_cache_size)
+
+
+def get_plugin_name(plugin):
+    if isinstance(plugin, str):
+        return plugin
+    return "%s.%s" % (plugin.__module__, plugin.__qualname__)
+
+
+# Memoized get_config_version(), reset when plugins or settings change
+_config_version = None
+
+
+def clear_config_version():
+    global _config_version
+    _config_version = None
+
+
+def reset_config_version(setting, **kwargs):
+    if setting == "COREPLUS":
+        clear_config_version()
+
+
+setting_changed.connect(reset_config_version)
+
+
+def get_config_version():
+    """
+    Digest of everything besides the source that changes the output, the
+    bleach whitelist, the plugins and MARKDOWN_CACHE_VERSION.
+    """
+    global _config_version
+    if _config_version is not None:
+        return _config_version
+    config = [
+        configs.MARKDOWN_CACHE_VERSION,
+        sorted(ALLOWED_TAGS),
+        sorted((tag, sorted(attrs)) for tag, attrs in ALLOWED_ATTRIBUTES.items()),
+        sorted(ALLOWED_PROTOCOLS),
+        [get_plugin_name(plugin) for plugin in registry.get_plugins()],
+    ]
+    _config_version = repr(config)
+    return _config_version
+
+
+def get_render_key(name, text, clean=True, escape=False):
+    """Content addressed cache key of a markdown rendering"""
+    digest = hashlib.sha256()
+    for part in (get_config_version(), name, repr((clean, escape)), text):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return "coreplus.markdown.%s" % digest.hexdigest()
+
+
+def cached_render(func):
+    """
+    Cache the html rendered by ``func(text, clean, escape)``, looked up in
+    the local LRU first, then in the MARKDOWN_CACHE_ALIAS Django cache.
+    Pass ``cache=False`` to bypass it, e.g. when the result is persisted.
+    Backend errors are logged and the text is rendered without the cache.
+    """
+
+    @wraps(func)
+    def inner(text, clean=True, escape=False, cache=True):
+        if not cache or not configs.MARKDOWN_CACHE or not text:
+            return func(text, clean=clean, escape=escape)
+
+        key = get_render_key(func.__name__, text, clean=clean, escape=escape)
+        html = render_cache.get(key)
+        if html is not None:
+            return html
+
+        backend = caches[configs.MARKDOWN_CACHE_ALIAS]
+        try:
+            html = backend.get(key)
+        except Exception as exc:
+            logger.error("Error reading the markdown cache: %s", exc)
+            return func(text, clean=clean, escape=escape)
+        if html is None:
+            html = func(text, clean=clean, escape=escape)
+            try:
+                backend.set(key, html, configs.MARKDOWN_CACHE_TIMEOUT)
+            except Exception as exc:
+                logger.error("Error writing the markdown cache: %s", exc)
+        render_cache.set(key, html)
+        return html
+
+    return inner
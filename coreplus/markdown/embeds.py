@@ -0,0 +1,101 @@
+import re
+import secrets
+from contextlib import contextmanager
+from contextvars import ContextVar
+from html import escape
+
+# Embed plugins render a placeholder instead of the final html, the
+# placeholder survives bleach and is expanded once the output is clean.
+# Placeholders carry a nonce of the render, the ones typed by users can't
+# know it and are dropped by filter_embeds().
+EMBED_TAG = "coreplus-embed"
+EMBED_HTML = '<coreplus-embed data-name="%s" data-uid="%s"></coreplus-embed>'
+EMBED_NONCE_HTML = (
+    '<coreplus-embed data-name="%s" data-uid="%s" data-nonce="%s"></coreplus-embed>'
+)
+EMBED_PATTERN = re.compile(
+    r"<coreplus-embed\b(?P<attrs>(?:[^>\"']|\"[^\"]*\"|'[^']*')*)>\s*</coreplus-embed>",
+    re.IGNORECASE,
+)
+EMBED_ATTR_PATTERN = re.compile(r"data-(name|uid|nonce)=([\"'])(.*?)\2")
+EMBED_UID_PATTERN = re.compile(r"^[\w/-]+$")
+
+_nonce = ContextVar("coreplus_embed_nonce", default=None)
+
+
+def new_nonce():
+    return secrets.token_urlsafe(16)
+
+
+@contextmanager
+def embed_nonce(nonce):
+    """Placeholders rendered in this block carry ``nonce``"""
+    token = _nonce.set(nonce)
+    try:
+        yield nonce
+    finally:
+        _nonce.reset(token)
+
+
+def render_placeholder(name, uid):
+    return EMBED_NONCE_HTML % (escape(name), escape(uid), _nonce.get() or "")
+
+
+def get_placeholder_renderer(name):
+    """Return a mistune renderer method emitting ``name`` placeholders"""
+
+    def render(uid):
+        return render_placeholder(name, uid)
+
+    render.__name__ = "render_%s_placeholder" % name
+    return render
+
+
+def get_embed_attrs(match):
+    return {
+        key: value for key, _, value in EMBED_ATTR_PATTERN.findall(match.group("attrs"))
+    }
+
+
+def filter_embeds(html, nonce, names):
+    """
+    Keep the placeholders of sanitized ``html`` rendered with ``nonce`` by
+    one of the embed ``names`` and drop any other, e.g. typed by users.
+    The kept ones lose their nonce so the html can be cached.
+    """
+    if EMBED_TAG not in html:
+        return html
+
+    def check(match):
+        attrs = get_embed_attrs(match)
+        name = attrs.get("name")
+        uid = attrs.get("uid", "")
+        if (
+            not nonce
+            or attrs.get("nonce") != nonce
+            or name not in names
+            or not EMBED_UID_PATTERN.match(uid)
+        ):
+            return ""
+        return EMBED_HTML % (name, uid)
+
+    return EMBED_PATTERN.sub(check, html)
+
+
+def expand_embeds(html, renderers):
+    """
+    Replace the placeholders of ``html`` checked by filter_embeds() with
+    the output of ``renderers[name](uid)``, unknown names are dropped.
+    """
+    if EMBED_TAG not in html:
+        return html
+
+    def expand(match):
+        attrs = get_embed_attrs(match)
+        render = renderers.get(attrs.get("name"))
+        uid = attrs.get("uid", "")
+        if render is None or not EMBED_UID_PATTERN.match(uid):
+            return ""
+        return render(uid)
+
+    return EMBED_PATTERN.sub(expand, html)
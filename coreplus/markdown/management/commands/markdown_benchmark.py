@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+
+from coreplus.markdown.benchmarks import CORPUS_SIZES, run_benchmark
+
+
+class Command(BaseCommand):
+    help = "Benchmark markdown rendering time and allocations per stage."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--size",
+            action="append",
+            dest="sizes",
+            choices=list(CORPUS_SIZES),
+            help="Document size to benchmark, can be repeated. Defaults to all.",
+        )
+        parser.add_argument(
+            "--stage",
+            action="append",
+            dest="stages",
+            help="Stage to benchmark, e.g. parse or bleach.clean, can be "
+            "repeated. Defaults to all.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Number of timed runs of each stage.",
+        )
+
+    def handle(self, *args, **options):
+        results = run_benchmark(
+            sizes=options["sizes"],
+            stages=options["stages"],
+            repeat=options["repeat"],
+        )
+        for result in results:
+            self.stdout.write(
+                "{size} ({length} chars) {stage}: mean {mean_ms:.2f}ms, "
+                "min {min_ms:.2f}ms, peak {peak_kb:.1f}KiB, "
+                "retained {retained_kb:.1f}KiB".format(
+                    mean_ms=result["mean"] * 1000,
+                    min_ms=result["min"] * 1000,
+                    peak_kb=result["peak"] / 1024,
+                    retained_kb=result["retained"] / 1024,
+                    **result,
+                )
+            )
@@ -0,0 +1,69 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from coreplus.utils.models.fields import MarkdownField
+
+
+def get_markdown_fields(model):
+    return [
+        field
+        for field in model._meta.concrete_fields
+        if isinstance(field, MarkdownField) and field.add_rendered_field
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-renders the stored html of MarkdownFields, run it after changing "
+        "the markdown plugins or the bleach whitelist."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models",
+            nargs="*",
+            help="Models to re-render in app_label.ModelName format, defaults to all.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            dest="batch_size",
+            type=int,
+            default=500,
+            help="Rows fetched and updated per database round-trip.",
+        )
+
+    def get_models(self, labels):
+        if not labels:
+            return [model for model in apps.get_models() if get_markdown_fields(model)]
+        models = []
+        for label in labels:
+            try:
+                models.append(apps.get_model(label))
+            except (LookupError, ValueError) as exc:
+                raise CommandError(exc)
+        return models
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        for model in self.get_models(options["models"]):
+            fields = get_markdown_fields(model)
+            if not fields:
+                raise CommandError("%s has no MarkdownField." % model._meta.label)
+            rendered_fields = [field.rendered_field_name for field in fields]
+            queryset = model._default_manager.order_by().only(
+                *[f.attname for f in fields]
+            )
+            batch = []
+            count = 0
+            for obj in queryset.iterator(chunk_size=batch_size):
+                for field in fields:
+                    field.render(obj)
+                batch.append(obj)
+                if len(batch) >= batch_size:
+                    model._default_manager.bulk_update(batch, rendered_fields)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                model._default_manager.bulk_update(batch, rendered_fields)
+                count += len(batch)
+            self.stdout.write("Re-rendered %s %s." % (count, model._meta.label))
@@ -1,6 +1,8 @@
 import logging
 import re
 
+from ..embeds import get_placeholder_renderer
+
 rec = re.compile
 logger = logging.getLogger("engine")
 
@@ -30,6 +32,6 @@ def plugin_gist(md):
     # add wiki rule into active rules
     md.inline.rules.append("gist")
 
-    # add HTML renderer
+    # add HTML renderer, the placeholder is expanded after sanitizing
     if md.renderer.NAME == "html":
-        md.renderer.register("gist", render_html_gist)
+        md.renderer.register("gist", get_placeholder_renderer("gist"))
@@ -1,7 +1,14 @@
+import asyncio
 import json
 import logging
 import re
-from urllib import request
+from concurrent.futures import ThreadPoolExecutor
+from urllib import parse, request
+
+from django.core.cache import caches
+
+from ...configs import coreplus_configs as configs
+from ..embeds import get_placeholder_renderer
 
 esc = re.escape
 logger = logging.getLogger("slunic")
@@ -9,27 +16,137 @@ logger = logging.getLogger("slunic")
 # define regex for Twitter links
 # https://twitter.com/Linux/status/2311234267
 TWITTER_PATTERN = r"http(s)?:\/\/(www)?.?twitter.com\/\w+\/status(es)?\/(?P<uid>([\d]+))(\/)?([^\s]+)?"
+TWITTER_URL = "https://twitter.com/i/status/%s"
+
+# Rendered until the tweet is resolved, twitter widgets.js can hydrate it
+TWITTER_PLACEHOLDER = (
+    '<blockquote class="twitter-tweet" data-tweet-id="%s">'
+    '<a href="https://twitter.com/i/status/%s">https://twitter.com/i/status/%s</a>'
+    "</blockquote>"
+)
+
+
+class OEmbedResolver:
+    """
+    Resolve tweet ids to their oEmbed html. Results are kept in the
+    MARKDOWN_CACHE_ALIAS Django cache, failures are remembered briefly so
+    a dead tweet isn't requested on every prefetch.
+    """
+
+    cache_prefix = "coreplus.markdown.oembed"
+    failure_timeout = 60 * 5
+    timeout = 3
+    workers = 8
+
+    def __init__(self, endpoint=None, timeout=None):
+        self.endpoint = endpoint or configs.MARKDOWN_OEMBED_ENDPOINT
+        if timeout is not None:
+            self.timeout = timeout
+
+    @property
+    def cache(self):
+        return caches[configs.MARKDOWN_CACHE_ALIAS]
+
+    def get_cache_key(self, uid):
+        return "%s.%s" % (self.cache_prefix, uid)
+
+    def get_url(self, uid):
+        return self.endpoint.format(url=parse.quote(TWITTER_URL % uid, safe=""))
+
+    def get_cached(self, uid):
+        """Returns cached html, "" for a known failure or None when unknown"""
+        try:
+            return self.cache.get(self.get_cache_key(uid))
+        except Exception as exc:
+            logger.error(f"Error reading cached tweet {uid}: {exc}")
+            return None
+
+    def set_cached(self, uid, html, timeout):
+        try:
+            self.cache.set(self.get_cache_key(uid), html, timeout)
+        except Exception as exc:
+            logger.error(f"Error caching tweet {uid}: {exc}")
+
+    def fetch(self, uid):
+        url = self.get_url(uid)
+        logger.info(f"{uid}, {url}")
+        req = request.Request(url=url, headers={"User-Agent": "Mozilla/5.0"})
+        res = request.urlopen(req, timeout=self.timeout).read()
+        return json.loads(res)["html"]
+
+    def resolve(self, uid):
+        """Fetch and cache the html of tweet uid, returns "" on failure"""
+        try:
+            html = self.fetch(uid)
+        except Exception as exc:
+            logger.error(f"Error resolving tweet {uid}: {exc}")
+            self.set_cached(uid, "", self.failure_timeout)
+            return ""
+        self.set_cached(uid, html, configs.MARKDOWN_OEMBED_CACHE_TIMEOUT)
+        return html
+
+    def resolve_many(self, uids):
+        """Resolve the uncached uids concurrently, returns {uid: html}"""
+        uids = set(uids)
+        try:
+            cached = self.cache.get_many([self.get_cache_key(uid) for uid in uids])
+        except Exception as exc:
+            logger.error(f"Error reading cached tweets: {exc}")
+            cached = {}
+        results = {}
+        missing = []
+        for uid in uids:
+            html = cached.get(self.get_cache_key(uid))
+            if html is None:
+                missing.append(uid)
+            else:
+                results[uid] = html
+        if missing:
+            with ThreadPoolExecutor(
+                max_workers=min(self.workers, len(missing))
+            ) as pool:
+                results.update(zip(missing, pool.map(self.resolve, missing)))
+        return results
+
+    async def aresolve_many(self, uids):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.resolve_many, uids)
+
+
+def get_resolver():
+    return configs.MARKDOWN_OEMBED_RESOLVER()
+
+
+def get_tweet_ids(text):
+    return [m.group("uid") for m in re.finditer(TWITTER_PATTERN, text or "")]
+
+
+def prefetch_tweets(text):
+    """
+    Resolve every tweet linked in the markdown ``text`` concurrently, call
+    it before rendering (e.g. when content is saved) so that rendering
+    embeds tweets from the cache instead of placeholders.
+    """
+    return get_resolver().resolve_many(get_tweet_ids(text))
+
+
+async def aprefetch_tweets(text):
+    return await get_resolver().aresolve_many(get_tweet_ids(text))
 
 
 def get_tweet(tweet_id):
     """
-    Get the HTML code with the embedded tweet.
-    It requires an API call at https://api.twitter.com/1/statuses/oembed.json as documented here:
-    https://dev.twitter.com/docs/embedded-tweets - section "Embedded Tweets for Developers"
-    https://dev.twitter.com/docs/api/1/get/statuses/oembed
+    Get the HTML code with the embedded tweet, from the cache or with a
+    blocking oEmbed request.
     Params:
     tweet_id -- a tweet's numeric id like 2311234267 for the tweet at
     https://twitter.com/Linux/status/2311234267
     """
-    try:
-        url = "https://api.twitter.com/1/statuses/oembed.json?id={}".format(tweet_id)
-        logger.info(f"{tweet_id}, {url}")
-        req = request.Request(url=url, headers={"User-Agent": "Mozilla/5.0"})
-        res = request.urlopen(req, timeout=3).read()
-        data = json.loads(res)
-        return data["html"]
-    except Exception:
-        return ""
+    resolver = get_resolver()
+    html = resolver.get_cached(tweet_id)
+    if html is None:
+        html = resolver.resolve(tweet_id)
+    return html
 
 
 # define how to parse matched item
@@ -40,9 +157,12 @@ def parse_twitter(inline, m, state):
     return "twitter", uid
 
 
-# define how to render HTML
+# define how to render HTML, never blocks on the network
 def render_html_twitter(uid):
-    return '<div class="twitter-wrapper">' + get_tweet(uid) + "</div>"
+    html = get_resolver().get_cached(uid)
+    if not html:
+        html = TWITTER_PLACEHOLDER % (uid, uid, uid)
+    return '<div class="twitter-wrapper">' + html + "</div>"
 
 
 def plugin_twitter(md):
@@ -52,6 +172,6 @@ def plugin_twitter(md):
     # add wiki rule into active rules
     md.inline.rules.append("twitter")
 
-    # add HTML renderer
+    # add HTML renderer, the placeholder is expanded after sanitizing
     if md.renderer.NAME == "html":
-        md.renderer.register("twitter", render_html_twitter)
+        md.renderer.register("twitter", get_placeholder_renderer("twitter"))
@@ -1,6 +1,8 @@
 import logging
 import re
 
+from ..embeds import get_placeholder_renderer
+
 rec = re.compile
 logger = logging.getLogger("engine")
 
@@ -45,6 +47,7 @@ def plugin_youtube(md):
     md.inline.rules.append("youtube3")
 
     if md.renderer.NAME == "html":
-        md.renderer.register("youtube1", render_html_youtube)
-        md.renderer.register("youtube2", render_html_youtube)
-        md.renderer.register("youtube3", render_html_youtube)
+        render = get_placeholder_renderer("youtube")
+        md.renderer.register("youtube1", render)
+        md.renderer.register("youtube2", render)
+        md.renderer.register("youtube3", render)
@@ -0,0 +1,60 @@
+from .plugins import gist, twitter, youtube
+
+# Plugins of parse_simple(), parse() adds embeds and registered plugins
+BASE_PLUGINS = ["strikethrough", "footnotes", "table"]
+EMBED_PLUGINS = [gist.plugin_gist, twitter.plugin_twitter, youtube.plugin_youtube]
+
+# Expand the placeholders the embed plugins render, keyed by embed name
+EMBED_RENDERERS = {
+    "gist": gist.render_html_gist,
+    "twitter": twitter.render_html_twitter,
+    "youtube": youtube.render_html_youtube,
+}
+
+# Embed names rendered by each embed plugin
+EMBED_NAMES = {
+    gist.plugin_gist: "gist",
+    twitter.plugin_twitter: "twitter",
+    youtube.plugin_youtube: "youtube",
+}
+
+
+class PluginRegistry(list):
+    """
+    Extra mistune plugins used by :func:`coreplus.markdown.parse`,
+    register them once at startup, e.g. in ``AppConfig.ready()``.
+    """
+
+    def register(self, plugin):
+        # Don't bother registering this if it is already registered
+        if plugin in self:
+            return plugin
+        self.append(plugin)
+
+        # Cached parsers and render keys were built without this plugin
+        from . import clear_parsers
+        from .caches import clear_config_version
+
+        clear_parsers()
+        clear_config_version()
+        return plugin
+
+    def register_decorator(self, plugin=None):
+        if plugin is None:
+            return lambda plugin: self.register(plugin)
+        return self.register(plugin)
+
+    def get_embed_names(self, plugins):
+        """Return the embed names the ``plugins`` may render"""
+        return frozenset(
+            EMBED_NAMES[plugin] for plugin in plugins if plugin in EMBED_NAMES
+        )
+
+    def get_plugins(self, simple=False):
+        if simple:
+            return tuple(BASE_PLUGINS)
+        return tuple(EMBED_PLUGINS + BASE_PLUGINS + list(self))
+
+
+registry = PluginRegistry()
+register_plugin = registry.register_decorator
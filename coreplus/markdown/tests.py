@@ -1,6 +1,23 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from io import StringIO
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase, tag
 
+from bleach.html5lib_shim import BleachHTMLParser
+
 from coreplus import markdown
+from coreplus.markdown import caches
+from coreplus.markdown.benchmarks import run_benchmark
+from coreplus.markdown.caches import get_render_key, render_cache
+from coreplus.markdown.plugins import twitter
+from example.app.models import Page
 
 TEST_INPUT1 = """
 
@@ -35,6 +52,12 @@ https://twitter.com/Linux/status/2311234267
 https://gist.github.com/justsasri/a23c13b7d6e5a46f473a4f57673e9970#file-greet-py
 """
 
+TWEET_INPUT = """
+https://twitter.com/Linux/status/2311234267
+
+https://twitter.com/Linux/status/1234
+"""
+
 TEST_INPUT2 = """
 http://test.coreplus.co.id/accounts/profile/user-2/
 http://test.coreplus.co.id/p/p371285/
@@ -49,3 +72,273 @@ class MarkdownTestCase(TestCase):
     def test_markdown_parse(self):
         results = markdown.parse(TEST_INPUT1)
         return results
+
+    @tag("markdown_unit_test")
+    def test_markdown_parser_is_reused(self):
+        parser = markdown.get_parser()
+        self.assertIs(markdown.get_parser(), parser)
+        self.assertIsNot(markdown.get_parser(escape=True), parser)
+        self.assertIn("<del>gone</del>", markdown.parse_simple("~~gone~~"))
+
+    @tag("markdown_unit_test")
+    def test_markdown_register_plugin(self):
+        def plugin_shout(md):
+            md.before_parse_hooks.append(lambda md, s, state: (s.upper(), state))
+
+        parser = markdown.get_parser()
+        version = caches.get_config_version()
+        markdown.register_plugin(plugin_shout)
+        try:
+            self.assertIsNot(markdown.get_parser(), parser)
+            self.assertNotEqual(caches.get_config_version(), version)
+            self.assertIn("HELLO", markdown.parse("hello"))
+            self.assertNotIn("HELLO", markdown.parse_simple("hello"))
+        finally:
+            markdown.registry.remove(plugin_shout)
+            markdown.clear_parsers()
+            caches.clear_config_version()
+        self.assertEqual(caches.get_config_version(), version)
+
+    @tag("markdown_unit_test")
+    def test_markdown_render_cache(self):
+        render_cache.clear()
+        html = markdown.parse_simple("**cached**")
+        with mock.patch("mistune.markdown.Markdown.parse") as parse:
+            self.assertEqual(markdown.parse_simple("**cached**"), html)
+            render_cache.clear()
+            self.assertEqual(markdown.parse_simple("**cached**"), html)
+            parse.assert_not_called()
+        key = get_render_key("parse_simple", "**cached**")
+        self.assertNotEqual(
+            key, get_render_key("parse_simple", "**cached**", escape=True)
+        )
+        self.assertNotEqual(key, get_render_key("parse", "**cached**"))
+        with self.settings(COREPLUS={"MARKDOWN_CACHE_VERSION": "2"}):
+            self.assertNotEqual(key, get_render_key("parse_simple", "**cached**"))
+        self.assertEqual(key, get_render_key("parse_simple", "**cached**"))
+
+    @tag("markdown_unit_test")
+    def test_markdown_single_pass_clean(self):
+        text = (
+            "https://www.coreplus.co.id/p/1\n\n"
+            "https://www.youtube.com/watch?v=Hc8QdwfYFT8\n\n"
+            "<script>alert(1)</script>\n\n[x](javascript:alert(1))\n\n"
+            "| a |\n|:-|\n| 1 |\n\nnote[^1]\n\n[^1]: footnote\n"
+        )
+        with mock.patch(
+            "bleach.html5lib_shim.BleachHTMLParser.parseFragment",
+            autospec=True,
+            side_effect=BleachHTMLParser.parseFragment,
+        ) as parse_fragment:
+            html = markdown.parse(text, cache=False)
+        self.assertEqual(parse_fragment.call_count, 1)
+        self.assertIn('rel="nofollow" target="_blank"', html)
+        self.assertIn('<iframe src="//www.youtube.com/embed/Hc8QdwfYFT8"', html)
+        self.assertNotIn("<script>", html)
+        self.assertNotIn('href="javascript:', html)
+        self.assertIn('<th style="text-align:left">', html)
+        self.assertIn('<li id="fn-1">', html)
+
+        # User controlled styles and ids are limited to alignment and footnotes
+        html = markdown.parse(
+            '<p id="main" style="color:red;text-align:right">x</p>', cache=False
+        )
+        self.assertIn('<p style="text-align:right">x</p>', html)
+
+    @tag("markdown_unit_test")
+    def test_markdown_embed_injection(self):
+        placeholders = [
+            '<coreplus-embed data-name="gist" data-uid="evil/abc"></coreplus-embed>',
+            '<coreplus-embed data-name="youtube" data-uid="abc" data-nonce="">'
+            "</coreplus-embed>",
+            '<coreplus-embed data-name="youtube" data-uid=\'"><b>\'>'
+            "</coreplus-embed>",
+        ]
+        for text in placeholders:
+            for html in [
+                markdown.parse(text, cache=False),
+                markdown.parse(text, clean=False, cache=False),
+                markdown.parse_simple(text, cache=False),
+                "".join(markdown.stream(text)),
+                "".join(markdown.stream(text, simple=True)),
+            ]:
+                self.assertNotIn("coreplus-embed", html)
+                self.assertNotIn("<script", html)
+                self.assertNotIn("<iframe", html)
+
+        # parse_simple renders no embeds, not even its own urls
+        html = markdown.parse_simple("https://youtu.be/abc", cache=False)
+        self.assertNotIn("<iframe", html)
+        self.assertIn("<iframe", markdown.parse("https://youtu.be/abc", cache=False))
+
+    @tag("markdown_unit_test")
+    def test_markdown_render_many(self):
+        texts = ["**%s** https://www.coreplus.co.id/p/%s" % (i, i) for i in range(7)]
+        expected = [markdown.parse(text) for text in texts]
+        self.assertEqual(list(markdown.render_many(iter(texts))), expected)
+        self.assertEqual(
+            list(markdown.render_many(texts, workers=2, chunk_size=2, cache=False)),
+            expected,
+        )
+
+        # A single chunk is rendered in process
+        with mock.patch.object(markdown, "ProcessPoolExecutor") as executor:
+            results = list(markdown.render_many(texts, workers=2, simple=True))
+            executor.assert_not_called()
+        self.assertEqual(results, [markdown.parse_simple(text) for text in texts])
+
+    @tag("markdown_unit_test")
+    def test_markdown_stream(self):
+        text = TEST_INPUT1 + "\n\n| a |\n|:-|\n| 1 |\n\nnote[^1]\n\n[^1]: footnote\n"
+        chunks = list(markdown.stream(text, chunk_size=100))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), markdown.parse(text, cache=False))
+        self.assertEqual(
+            "".join(markdown.stream(text, simple=True)),
+            markdown.parse_simple(text, cache=False),
+        )
+
+    @tag("markdown_unit_test")
+    def test_markdown_benchmark(self):
+        results = run_benchmark(
+            sizes=["small"], stages=["parse", "bleach.clean"], repeat=1
+        )
+        self.assertEqual(
+            [(result["size"], result["stage"]) for result in results],
+            [("small", "parse"), ("small", "bleach.clean")],
+        )
+        self.assertGreater(results[0]["mean"], 0)
+        self.assertGreater(results[0]["peak"], 0)
+
+    @tag("markdown_unit_test")
+    def test_markdown_render_cache_backend_error(self):
+        render_cache.clear()
+        text = "<img src=x onerror=alert(1)> **down**"
+        backend = "django.core.cache.backends.locmem.LocMemCache"
+        with mock.patch("%s.get" % backend, side_effect=ConnectionError):
+            with self.assertLogs("engine", "ERROR"):
+                html = markdown.parse(text)
+        self.assertNotIn("onerror", html)
+        self.assertIn("<strong>down</strong>", html)
+        with mock.patch("%s.set" % backend, side_effect=ConnectionError):
+            with self.assertLogs("engine", "ERROR"):
+                self.assertEqual(
+                    markdown.parse_simple(text),
+                    markdown.parse_simple(text, cache=False),
+                )
+
+    @tag("markdown_unit_test")
+    def test_markdown_field(self):
+        page = Page.objects.create(title="page", body="**bold**")
+        self.assertEqual(page.body.rendered, markdown.parse("**bold**"))
+        page = Page.objects.get(pk=page.pk)
+        self.assertEqual(page.body.content, "**bold**")
+        self.assertIn("<strong>bold</strong>", page.body.rendered)
+
+        Page.objects.filter(pk=page.pk).update(_body_rendered="")
+        call_command("rerender_markdown", "app.Page", stdout=StringIO())
+        page.refresh_from_db()
+        self.assertIn("<strong>bold</strong>", page.body.rendered)
+
+    @tag("markdown_unit_test")
+    def test_markdown_field_save(self):
+        page = Page.objects.create(title="page", body="**bold**")
+        page = Page.objects.get(pk=page.pk)
+        with mock.patch("mistune.markdown.Markdown.parse") as parse:
+            page.title = "renamed"
+            page.save()
+            parse.assert_not_called()
+
+        page.body = "*em*"
+        page.save(update_fields=["body"])
+        page = Page.objects.get(pk=page.pk)
+        self.assertIn("<em>em</em>", page.body.rendered)
+
+
+class OEmbedStubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        uid = query["url"][0].rsplit("/", 1)[-1]
+        body = json.dumps({"html": "<blockquote>tweet %s</blockquote>" % uid})
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body.encode("utf-8"))
+
+    def log_message(self, *args):
+        pass
+
+
+class TwitterEmbedTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = HTTPServer(("127.0.0.1", 0), OEmbedStubHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        render_cache.clear()
+        endpoint = "http://127.0.0.1:%s/oembed?url={url}" % self.server.server_port
+        self.settings_override = self.settings(
+            COREPLUS={"MARKDOWN_OEMBED_ENDPOINT": endpoint}
+        )
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+
+    @tag("markdown_unit_test")
+    def test_twitter_cache_backend_error(self):
+        text = TWEET_INPUT + "\n\n<img src=x onerror=alert(1)>"
+        backend = "django.core.cache.backends.locmem.LocMemCache"
+        with mock.patch("%s.get" % backend, side_effect=ConnectionError):
+            with self.settings(COREPLUS={"MARKDOWN_CACHE": False}):
+                html = markdown.parse(text)
+        self.assertNotIn("onerror", html)
+        self.assertIn('data-tweet-id="2311234267"', html)
+
+    @tag("markdown_unit_test")
+    def test_markdown_field_prefetches_tweets(self):
+        page = Page.objects.create(title="tweet", body=TWEET_INPUT)
+        page = Page.objects.get(pk=page.pk)
+        self.assertIn("tweet 2311234267", page.body.rendered)
+
+    @tag("markdown_unit_test")
+    def test_twitter_render_never_fetches(self):
+        with mock.patch.object(twitter.OEmbedResolver, "fetch") as fetch:
+            html = markdown.parse(TWEET_INPUT, cache=False)
+            fetch.assert_not_called()
+        self.assertIn('data-tweet-id="2311234267"', html)
+
+    @tag("markdown_unit_test")
+    def test_twitter_resolved_after_cached_render(self):
+        html = markdown.parse(TWEET_INPUT)
+        self.assertIn('data-tweet-id="2311234267"', html)
+        twitter.prefetch_tweets(TWEET_INPUT)
+        self.assertIn("tweet 2311234267", markdown.parse(TWEET_INPUT))
+        render_cache.clear()
+        self.assertIn("tweet 2311234267", markdown.parse(TWEET_INPUT))
+
+    @tag("markdown_unit_test")
+    def test_twitter_prefetch(self):
+        results = twitter.prefetch_tweets(TWEET_INPUT)
+        self.assertEqual(
+            results,
+            {
+                "2311234267": "<blockquote>tweet 2311234267</blockquote>",
+                "1234": "<blockquote>tweet 1234</blockquote>",
+            },
+        )
+        html = markdown.parse(TWEET_INPUT, cache=False)
+        self.assertIn("tweet 2311234267", html)
+        with mock.patch.object(twitter.OEmbedResolver, "fetch") as fetch:
+            asyncio.run(twitter.aprefetch_tweets(TWEET_INPUT))
+            fetch.assert_not_called()
@@ -1,5 +1,5 @@
 from django.apps import AppConfig
-from django.db.models.signals import post_migrate
+from django.db.models.signals import post_delete, post_migrate, post_save
 from django.utils.translation import gettext_lazy as _
 
 
@@ -10,7 +10,12 @@ class NumeratorsConfig(AppConfig):
     verbose_name = _("Numerators")
 
     def ready(self):
+        from .caches import invalidate_numerator_cache
+
         post_migrate.connect(init_app, sender=self)
+        Numerator = self.get_model("Numerator")
+        post_save.connect(invalidate_numerator_cache, sender=Numerator)
+        post_delete.connect(invalidate_numerator_cache, sender=Numerator)
 
 
 def init_app(sender, **kwargs):
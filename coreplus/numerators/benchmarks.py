@@ -0,0 +1,134 @@
+"""
+Benchmark numerator allocation under concurrent writers.
+
+Each worker saves ``iterations`` instances of a ``NumeratorMixin`` model and
+records the latency, the allocated reg_number and the number of retries
+(unique constraint violations) of every save. Run it against a scratch
+database, the rows it creates are removed afterwards unless ``keep`` is set.
+"""
+
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.db import DatabaseError, IntegrityError, connections
+
+from .models import NumeratorReset
+
+
+def percentile(values, percent):
+    """Nearest rank percentile of an already sorted list"""
+    if not values:
+        return 0.0
+    rank = max(math.ceil(percent / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+def save_numbered(model, reset_mode, iterations, max_retries=3, using=None):
+    """
+    Save ``iterations`` new ``model`` instances, returns a list of
+    (latency, pk, reg_number, numerator_pk, retries, error) samples.
+    """
+    samples = []
+    try:
+        for i in range(iterations):
+            retries = 0
+            error = None
+            start = time.perf_counter()
+            while True:
+                obj = model()
+                obj.reset_mode = reset_mode
+                try:
+                    obj.save(using=using)
+                    break
+                except IntegrityError as exc:
+                    retries += 1
+                    if retries > max_retries:
+                        error = exc.__class__.__name__
+                        break
+                except DatabaseError as exc:
+                    error = exc.__class__.__name__
+                    break
+            latency = time.perf_counter() - start
+            if error is None:
+                allocation = (obj.pk, obj.reg_number, obj.numerator.pk)
+            else:
+                allocation = (None, None, None)
+            samples.append((latency, *allocation, retries, error))
+    finally:
+        connections.close_all()
+    return samples
+
+
+def summarize(samples, elapsed):
+    """Aggregate worker samples into allocation statistics"""
+    latencies = sorted(sample[0] for sample in samples)
+    numbers = {}
+    errors = 0
+    retries = 0
+    for latency, pk, reg_number, numerator_pk, retry, error in samples:
+        retries += retry
+        if error is not None:
+            errors += 1
+            continue
+        numbers.setdefault(numerator_pk, []).append(reg_number)
+
+    allocations = sum(len(values) for values in numbers.values())
+    duplicates = 0
+    gaps = 0
+    for values in numbers.values():
+        unique = set(values)
+        duplicates += len(values) - len(unique)
+        gaps += (max(unique) - min(unique) + 1) - len(unique)
+
+    return {
+        "allocations": allocations,
+        "elapsed": elapsed,
+        "throughput": allocations / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+        "duplicates": duplicates,
+        "retries": retries,
+        "errors": errors,
+        "gaps": gaps,
+    }
+
+
+def run_benchmark(
+    model,
+    reset_mode=NumeratorReset.YEARLY,
+    workers=4,
+    iterations=100,
+    processes=False,
+    max_retries=3,
+    using=None,
+    keep=False,
+):
+    """
+    Run ``workers`` concurrent writers, threads by default or forked
+    processes, and return the summary for ``reset_mode``.
+    """
+    args = (model, reset_mode, iterations, max_retries, using)
+    if processes:
+        # Forked children must not share the parent connections
+        connections.close_all()
+        executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("fork")
+        )
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers)
+
+    start = time.perf_counter()
+    with executor:
+        futures = [executor.submit(save_numbered, *args) for i in range(workers)]
+        samples = [sample for future in futures for sample in future.result()]
+    elapsed = time.perf_counter() - start
+
+    if not keep:
+        pks = [sample[1] for sample in samples if sample[1] is not None]
+        model._default_manager.using(using).filter(pk__in=pks).delete()
+
+    result = summarize(samples, elapsed)
+    result["reset_mode"] = reset_mode.value
+    return result
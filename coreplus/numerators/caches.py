@@ -0,0 +1,31 @@
+from ..configs import coreplus_configs as configs
+from ..utils.caches import LRUCache
+
+
+def get_cache_size():
+    return configs.NUMERATOR_CACHE_SIZE
+
+
+class NumeratorCache(LRUCache):
+    """
+    Process local LRU of numerator rows keyed by (app_label, model,
+    prefix, reset_mode, year, month). Only the identity of the row is
+    cached, never its counter value.
+    """
+
+    def __init__(self, maxsize=None):
+        super().__init__(maxsize or get_cache_size)
+
+    def discard(self, pk):
+        """Drop every entry pointing to numerator ``pk``"""
+        with self._lock:
+            keys = [key for key, value in self._data.items() if value["id"] == pk]
+            for key in keys:
+                del self._data[key]
+
+
+numerator_cache = NumeratorCache()
+
+
+def invalidate_numerator_cache(sender, instance, **kwargs):
+    numerator_cache.discard(instance.pk)
@@ -0,0 +1,89 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from coreplus.numerators.benchmarks import run_benchmark
+from coreplus.numerators.models import NumeratorMixinBase, NumeratorReset
+
+
+class Command(BaseCommand):
+    help = "Benchmark numerator allocation with concurrent writers."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "model",
+            help="NumeratorMixin model to save, in app_label.ModelName format.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of concurrent writers.",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=100,
+            help="Number of objects saved by each writer.",
+        )
+        parser.add_argument(
+            "--processes",
+            action="store_true",
+            default=False,
+            help="Use forked processes instead of threads.",
+        )
+        parser.add_argument(
+            "--reset-mode",
+            action="append",
+            dest="reset_modes",
+            choices=[mode.value for mode in NumeratorReset],
+            help="Reset mode to benchmark, can be repeated. Defaults to all.",
+        )
+        parser.add_argument(
+            "--max-retries",
+            type=int,
+            default=3,
+            help="Retries of a save failing on a unique constraint.",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database to run against, use a scratch database.",
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            default=False,
+            help="Keep the created objects.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            model = apps.get_model(options["model"])
+        except (LookupError, ValueError) as exc:
+            raise CommandError(exc)
+        if not issubclass(model, NumeratorMixinBase):
+            raise CommandError("%s is not a numerator model." % options["model"])
+
+        reset_modes = options["reset_modes"] or [mode.value for mode in NumeratorReset]
+        for reset_mode in reset_modes:
+            result = run_benchmark(
+                model,
+                reset_mode=NumeratorReset(reset_mode),
+                workers=options["workers"],
+                iterations=options["iterations"],
+                processes=options["processes"],
+                max_retries=options["max_retries"],
+                using=options["database"],
+                keep=options["keep"],
+            )
+            self.stdout.write(
+                "{reset_mode}: {allocations} allocations in {elapsed:.2f}s "
+                "({throughput:.1f}/s), p50 {p50_ms:.2f}ms, p99 {p99_ms:.2f}ms, "
+                "duplicates {duplicates}, retries {retries}, errors {errors}, "
+                "gaps {gaps}".format(
+                    p50_ms=result["p50"] * 1000,
+                    p99_ms=result["p99"] * 1000,
+                    **result,
+                )
+            )
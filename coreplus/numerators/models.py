@@ -1,9 +1,11 @@
 import enum
 
-from django.db import models
+from django.db import connections, models, router, transaction
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from .caches import numerator_cache
+
 
 class NumeratorManager(models.Manager):
     def get_queryset(self):
@@ -12,6 +14,57 @@ class NumeratorManager(models.Manager):
     def get_by_natural_key(self, ctype, date_start, date_end):
         return self.get(ctype=ctype, date_start=date_start, date_end=date_end)
 
+    def can_update_returning(self, connection):
+        """
+        Return True if the backend supports ``UPDATE ... RETURNING``,
+        PostgreSQL and SQLite 3.35+ do, MySQL/MariaDB don't.
+        """
+        return connection.vendor in ("postgresql", "sqlite") and getattr(
+            connection.features, "can_return_columns_from_insert", False
+        )
+
+    def increment(self, pk, step=1, using=None):
+        """
+        Atomically add ``step`` to the counter of numerator ``pk`` and return
+        the new counter value. Uses a single ``UPDATE ... RETURNING`` statement
+        when the backend supports it, otherwise falls back to a short
+        ``select_for_update`` transaction.
+        """
+        using = using or router.db_for_write(self.model)
+        connection = connections[using]
+        if self.can_update_returning(connection):
+            qn = connection.ops.quote_name
+            opts = self.model._meta
+            counter = qn(opts.get_field("counter").column)
+            sql = "UPDATE %s SET %s = %s + %%s WHERE %s = %%s RETURNING %s" % (
+                qn(opts.db_table),
+                counter,
+                counter,
+                qn(opts.pk.column),
+                counter,
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(sql, [step, pk])
+                row = cursor.fetchone()
+            if row is None:
+                raise self.model.DoesNotExist(
+                    "%s matching query does not exist." % self.model._meta.object_name
+                )
+            return row[0]
+        with transaction.atomic(using=using):
+            queryset = self.using(using).select_for_update()
+            counter = queryset.values_list("counter", flat=True).get(pk=pk) + step
+            queryset.filter(pk=pk).update(counter=counter)
+        return counter
+
+    def ensure_counter(self, pk, value, using=None):
+        """
+        Atomically raise the counter of numerator ``pk`` to ``value``
+        if it is currently lower, used when a number is assigned manually.
+        """
+        queryset = self.using(using or router.db_for_write(self.model))
+        return queryset.filter(pk=pk, counter__lt=value).update(counter=value)
+
 
 class NumeratorReset(enum.Enum):
     YEARLY = "YEAR"
@@ -75,6 +128,26 @@ class Numerator(models.Model):
         self.counter += 1
         return self.counter
 
+    def next_counter(self):
+        """
+        Allocate the next counter value in the database, safe for
+        concurrent writers, and sync the in-memory counter with it.
+        """
+        self.counter = Numerator.objects.increment(self.pk, using=self._state.db)
+        return self.counter
+
+    def reserve(self, count):
+        """
+        Reserve a contiguous block of ``count`` counter values in one
+        statement and return them as a range.
+        """
+        if count < 1:
+            return range(0)
+        self.counter = Numerator.objects.increment(
+            self.pk, step=count, using=self._state.db
+        )
+        return range(self.counter - count + 1, self.counter + 1)
+
     def decrease_counter(self):
         i = 1 if self.counter > 0 else 0
         self.counter -= i
@@ -85,25 +158,74 @@ class Numerator(models.Model):
         return self.counter
 
     @staticmethod
-    def get_for_instance(obj):
+    def get_matrix_for_instance(obj):
         opts = obj._meta
-        get_matrix = {
-            "app_label": opts.app_label,
-            "model": (opts.model_name if not obj.parent_prefix else obj.parent_model),
-            "prefix": obj.get_doc_prefix(),
-        }
         create_matrix = {
             "app_label": opts.app_label,
             "model": (opts.model_name if not obj.parent_prefix else obj.parent_model),
             "prefix": obj.get_doc_prefix(),
             "year": obj.get_date_field().year,
-            "month": obj.get_date_field().month
-            if obj.reset_mode == NumeratorReset.MONTHLY
-            else 0,
+            "month": (
+                obj.get_date_field().month
+                if obj.reset_mode == NumeratorReset.MONTHLY
+                else 0
+            ),
             "reset_mode": obj.reset_mode,
         }
-        get_or_create = Numerator.objects.get_or_create
+        return create_matrix
+
+    @staticmethod
+    def get_lookup_for_instance(obj):
+        """
+        Return the unique together lookup of the numerator for ``obj``,
+        the period (year, month) is left out for fixed numerators.
+        """
+        matrix = Numerator.get_matrix_for_instance(obj)
+        lookup = {
+            "app_label": matrix["app_label"],
+            "model": matrix["model"],
+            "prefix": matrix["prefix"],
+            "reset_mode": matrix["reset_mode"],
+        }
+        if obj.reset_mode != NumeratorReset.FIXED:
+            lookup["year"] = matrix["year"]
+            lookup["month"] = matrix["month"]
+        return lookup
+
+    @staticmethod
+    def get_cache_key(lookup, using=None):
+        keys = ["app_label", "model", "prefix", "reset_mode", "year", "month"]
+        return (using, *(lookup.get(key) for key in keys))
+
+    @staticmethod
+    def get_for_instance(obj, using=None):
+        """
+        Get or create the numerator for ``obj`` in the ``using`` database.
+        Rows are remembered in a process local cache, on a cache hit the
+        returned instance is built without a query and its counter is
+        deferred.
+        """
+        using = using or router.db_for_write(Numerator)
+        create_matrix = Numerator.get_matrix_for_instance(obj)
+        get_matrix = Numerator.get_lookup_for_instance(obj)
+        cache_key = Numerator.get_cache_key(get_matrix, using)
+        values = numerator_cache.get(cache_key)
+        if values is not None:
+            return Numerator.from_db(using, list(values), list(values.values()))
+        get_or_create = Numerator.objects.db_manager(using).get_or_create
         ct_counter, created = get_or_create(**get_matrix, defaults=create_matrix)
+        values = {
+            field.attname: getattr(ct_counter, field.attname)
+            for field in Numerator._meta.concrete_fields
+            if field.attname != "counter"
+        }
+        if created:
+            # Don't cache rows that may still be rolled back
+            transaction.on_commit(
+                lambda: numerator_cache.set(cache_key, values), using=using
+            )
+        else:
+            numerator_cache.set(cache_key, values)
         return ct_counter
 
 
@@ -157,12 +279,24 @@ class NumeratorMixinBase(models.Model):
         inner_id = "{}{}{}".format(*form)
         return setattr(self, self.inner_id_field, inner_id)
 
-    def get_numerator(self):
+    def get_numerator(self, using=None):
         """Get or create numerator"""
-        numerator = Numerator.get_for_instance(self)
+        numerator = Numerator.get_for_instance(self, using=using)
         return numerator
 
-    def update_inner_id(self):
+    def reserve_numbers(self, count):
+        """Reserve a block of ``count`` registration numbers for this model"""
+        if self.numerator is None:
+            self.numerator = self.get_numerator()
+        try:
+            return self.numerator.reserve(count)
+        except Numerator.DoesNotExist:
+            # Cached numerator is gone, forget it and look it up again
+            numerator_cache.discard(self.numerator.pk)
+            self.numerator = self.get_numerator(using=self.numerator._state.db)
+            return self.numerator.reserve(count)
+
+    def update_inner_id(self, using=None):
         """
         Register and get Numerator instance for
         this model, Get latest counter value and then
@@ -170,24 +304,53 @@ class NumeratorMixinBase(models.Model):
         """
         # Get Numerator instance for this model
         if self.numerator is None:
-            self.numerator = self.get_numerator()
+            self.numerator = self.get_numerator(using=using)
 
         # If reg_number is None get new one
         if self.reg_number is None:
-            self.reg_number = self.numerator.increase_counter()
-
-        # If reg number > counter set new counter value
-        if self.reg_number > self.numerator.counter:
-            self.numerator.counter = self.reg_number
+            self.reg_number = self.reserve_numbers(1)[0]
+        else:
+            # Raise the counter to a manual reg number in the database, the
+            # counter of a cached numerator is deferred and not read here
+            updated = Numerator.objects.ensure_counter(
+                self.numerator.pk, self.reg_number, using=self.numerator._state.db
+            )
+            if updated:
+                self.numerator.counter = self.reg_number
 
         return self.format_inner_id()
 
     def save(self, *args, **kwargs):
         if self.numerator is None:
-            self.update_inner_id()
-        self.numerator.save()
+            self.update_inner_id(using=kwargs.get("using"))
         super().save(*args, **kwargs)
 
+    @classmethod
+    def bulk_create_with_numbers(cls, objs, batch_size=None, **kwargs):
+        """
+        Number and bulk create ``objs``. Objects without reg_number are
+        grouped by numerator and each group reserves its block of numbers
+        in one statement, inner_id is then formatted in memory.
+        """
+        objs = list(objs)
+        groups = {}
+        for obj in objs:
+            if obj.reg_number is not None:
+                obj.update_inner_id()
+                continue
+            matrix = Numerator.get_matrix_for_instance(obj)
+            groups.setdefault(tuple(matrix.values()), []).append(obj)
+
+        for group in groups.values():
+            numbers = group[0].reserve_numbers(len(group))
+            numerator = group[0].numerator
+            for obj, reg_number in zip(group, numbers):
+                obj.numerator = numerator
+                obj.reg_number = reg_number
+                obj.format_inner_id()
+
+        return cls._default_manager.bulk_create(objs, batch_size=batch_size, **kwargs)
+
 
 class NumeratorMixin(NumeratorMixinBase):
     """Mixin for Numerator Model"""
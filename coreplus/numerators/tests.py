@@ -0,0 +1,125 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, tag
+
+from example.app.models import Invoice
+
+from .benchmarks import summarize
+from .caches import numerator_cache
+from .models import Numerator
+
+
+class NumeratorTestCase(TestCase):
+    def setUp(self) -> None:
+        numerator_cache.clear()
+        self.numerator = Numerator.objects.create(
+            app_label="app", model="invoice", prefix="INV", year=2023
+        )
+        return super().setUp()
+
+    @tag("numerator_test")
+    def test_increment_counter(self):
+        self.assertEqual(Numerator.objects.increment(self.numerator.pk), 1)
+        self.assertEqual(Numerator.objects.increment(self.numerator.pk), 2)
+        self.assertEqual(self.numerator.next_counter(), 3)
+        self.numerator.refresh_from_db()
+        self.assertEqual(self.numerator.counter, 3)
+
+    @tag("numerator_test")
+    def test_increment_counter_without_returning(self):
+        Numerator.objects.increment(self.numerator.pk)
+        manager = Numerator.objects
+        with mock.patch.object(manager, "can_update_returning", return_value=False):
+            self.assertEqual(manager.increment(self.numerator.pk), 2)
+
+    @tag("numerator_test")
+    def test_numerator_mixin_inner_id(self):
+        first = Invoice.objects.create()
+        second = Invoice.objects.create()
+        self.assertEqual(first.reg_number, 1)
+        self.assertEqual(second.reg_number, 2)
+        self.assertEqual(second.inner_id, "INV%s0002" % second.format_date())
+
+    @tag("numerator_test")
+    def test_reserve_counter_block(self):
+        self.assertEqual(list(self.numerator.reserve(3)), [1, 2, 3])
+        self.assertEqual(list(self.numerator.reserve(2)), [4, 5])
+        self.assertEqual(self.numerator.counter, 5)
+
+    @tag("numerator_test")
+    def test_bulk_create_with_numbers(self):
+        Invoice.objects.create()
+        invoices = [Invoice(title="invoice %s" % i) for i in range(5)]
+        with self.assertNumQueries(3):
+            Invoice.bulk_create_with_numbers(invoices)
+        reg_numbers = Invoice.objects.order_by("reg_number")
+        self.assertEqual(
+            list(reg_numbers.values_list("reg_number", flat=True)), [1, 2, 3, 4, 5, 6]
+        )
+        self.assertEqual(
+            invoices[-1].inner_id, "INV%s0006" % invoices[-1].format_date()
+        )
+
+    @tag("numerator_test")
+    def test_numerator_cache(self):
+        Invoice.objects.create()
+        Invoice.objects.create()
+        self.assertEqual(len(numerator_cache), 1)
+        # Only the counter allocation and the insert hit the database
+        with self.assertNumQueries(2):
+            invoice = Invoice.objects.create()
+        self.assertEqual(invoice.reg_number, 3)
+
+        numerator = Numerator.objects.get(pk=invoice.numerator.pk)
+        numerator.delete()
+        self.assertEqual(len(numerator_cache), 0)
+
+    @tag("numerator_test")
+    def test_numerator_cache_manual_reg_number(self):
+        Invoice.objects.create()
+        Invoice.objects.create()
+        # The deferred counter of the cached numerator is never read
+        with self.assertNumQueries(2):
+            invoice = Invoice.objects.create(reg_number=10)
+        self.assertEqual(list(invoice.numerator.reserve(0)), [])
+        self.assertEqual(Invoice.objects.create().reg_number, 11)
+
+    @tag("numerator_test")
+    def test_numerator_cache_rollover(self):
+        Invoice.objects.create()
+        invoice = Invoice.objects.create()
+        next_year = Invoice.objects.create(
+            created_at=invoice.created_at + timedelta(days=366)
+        )
+        self.assertEqual(invoice.reg_number, 2)
+        self.assertEqual(next_year.reg_number, 1)
+        self.assertNotEqual(invoice.numerator.pk, next_year.numerator.pk)
+
+    @tag("numerator_test")
+    def test_numerator_follows_save_database(self):
+        invoice = Invoice.objects.create(title="routed")
+        self.assertEqual(invoice.numerator._state.db, "default")
+        invoice.numerator._state.db = "other"
+        manager = Numerator.objects
+        with mock.patch.object(manager, "increment", return_value=9) as increment:
+            self.assertEqual(invoice.numerator.next_counter(), 9)
+        increment.assert_called_once_with(invoice.numerator.pk, using="other")
+
+    @tag("numerator_test")
+    def test_benchmark_summary(self):
+        samples = [
+            (0.001, 1, 1, 1, 0, None),
+            (0.002, 2, 2, 1, 1, None),
+            (0.003, 3, 2, 1, 0, None),
+            (0.004, 4, 5, 1, 0, None),
+            (0.005, None, None, None, 4, "IntegrityError"),
+        ]
+        result = summarize(samples, elapsed=0.5)
+        self.assertEqual(result["allocations"], 4)
+        self.assertEqual(result["throughput"], 8)
+        self.assertEqual(result["p50"], 0.003)
+        self.assertEqual(result["duplicates"], 1)
+        self.assertEqual(result["retries"], 5)
+        self.assertEqual(result["errors"], 1)
+        self.assertEqual(result["gaps"], 2)
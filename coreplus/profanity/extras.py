@@ -1,8 +1,68 @@
 import os
 import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
 import inflection
 
+from ..utils.iterables import iter_chunks
+
+REGEX_METACHARS = set(".^$*+?{}[]|()\\")
+
+
+def unescape_word(word):
+    """
+    Return ``word`` as a plain string if it is a literal pattern like
+    ``bi\\+ch``, or None when it uses regex syntax.
+    """
+    if REGEX_METACHARS.intersection(re.sub(r"\\.", "", word)):
+        return None
+    return re.sub(r"\\(.)", r"\1", word)
+
+
+# Filter used by process pool workers, set once per worker process
+_worker_filter = None
+
+
+def _init_worker(profanity_filter):
+    global _worker_filter
+    _worker_filter = profanity_filter
+
+
+def _run_chunk(method, chunk):
+    func = getattr(_worker_filter, method)
+    return [func(text) for text in chunk]
+
+
+def build_trie_pattern(words):
+    """
+    Build a regex from a trie of ``words`` so matching walks shared
+    prefixes once instead of trying every word at each position.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    return _trie_node_pattern(trie)
+
+
+def _trie_node_pattern(node):
+    branches = [
+        re.escape(char) + _trie_node_pattern(child)
+        for char, child in sorted(node.items())
+        if char
+    ]
+    if not branches:
+        return ""
+    if len(branches) == 1 and "" not in node:
+        return branches[0]
+    pattern = "(?:%s)" % "|".join(branches)
+    if "" in node:
+        pattern += "?"
+    return pattern
+
 
 class ProfanityFilter:
     def __init__(self, **kwargs):
@@ -19,6 +79,9 @@ class ProfanityFilter:
         # What to censor the words with
         self._censor_char = "*"
 
+        # Compiled pattern of all profane words, built on first use
+        self._censor_regex = None
+
         # Where to find the censored words
         self._BASE_DIR = os.path.abspath(os.path.dirname(__file__))
         self._words_file = os.path.join(self._BASE_DIR, "wordlist.txt")
@@ -29,14 +92,17 @@ class ProfanityFilter:
         """Loads the list of profane words from file."""
         with open(self._words_file, "r") as f:
             self._censor_list = [line.strip() for line in f.readlines()]
+        self._censor_regex = None
 
     def define_words(self, word_list):
         """Define a custom list of profane words."""
         self._custom_censor_list = word_list
+        self._censor_regex = None
 
     def append_words(self, word_list):
         """Extends the profane word list with word_list"""
         self._extra_censor_list.extend(word_list)
+        self._censor_regex = None
 
     def set_censor(self, character):
         """Replaces the original censor character '*' with character"""
@@ -46,7 +112,7 @@ class ProfanityFilter:
 
     def has_bad_word(self, text):
         """Returns True if text contains profanity, False otherwise"""
-        return self.censor(text) != text
+        return self.find_profanity(text) is not None
 
     def get_custom_censor_list(self):
         """Returns the list of custom profane words"""
@@ -77,18 +143,88 @@ class ProfanityFilter:
         """Clears all custom censor lists"""
         self._custom_censor_list = []
         self._extra_censor_list = []
+        self._censor_regex = None
+
+    def get_censor_regex(self):
+        """
+        Returns the profane words compiled into a single regex, literal
+        words are merged into a trie, words using regex syntax are kept
+        as alternatives. The regex is cached until the word list changes.
+        """
+        if self._censor_regex is None:
+            literals = set()
+            patterns = []
+            for word in self.get_profane_words():
+                if not word:
+                    continue
+                literal = unescape_word(word)
+                if literal is None:
+                    patterns.append(word)
+                else:
+                    literals.add(literal.lower())
+            alternatives = [build_trie_pattern(literals)] if literals else []
+            alternatives.extend(sorted(patterns, key=len, reverse=True))
+            if alternatives:
+                # Apply word boundaries to the bad words
+                pattern = r"\b(?:%s)\b" % "|".join(alternatives)
+                self._censor_regex = re.compile(pattern, re.IGNORECASE)
+            else:
+                self._censor_regex = False
+        return self._censor_regex
+
+    def find_profanity(self, input_text):
+        """
+        Returns (term, (start, end)) of the first profane word found in
+        input_text, or None. Stops scanning at the first match.
+        """
+        regex = self.get_censor_regex()
+        if not regex:
+            return None
+        match = regex.search(input_text)
+        if match is None:
+            return None
+        return match.group(), match.span()
 
     def censor(self, input_text):
         """Returns input_text with any profane words censored"""
-        bad_words = self.get_profane_words()
-        res = input_text
-
-        for word in bad_words:
-            word = r"\b%s\b" % word  # Apply word boundaries to the bad word
-            regex = re.compile(word, re.IGNORECASE)
-            res = regex.sub(self._censor_char * (len(word) - 4), res)
-
-        return res
+        regex = self.get_censor_regex()
+        if not regex:
+            return input_text
+        return regex.sub(lambda m: self._censor_char * len(m.group()), input_text)
+
+    def map_many(self, method, iterable, workers=None, chunk_size=500):
+        """
+        Lazily yields ``method(text)`` for each text of iterable, in order.
+        With more than one worker, chunks are fanned out over a process pool
+        with a bounded number of chunks in flight, so memory stays constant.
+        """
+        func = getattr(self, method)
+        if not workers or workers <= 1:
+            for text in iterable:
+                yield func(text)
+            return
+
+        # Build the trie pattern once here, workers unpickle the pattern
+        # and only recompile it instead of reloading and merging the words
+        self.get_censor_regex()
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(self,)
+        ) as executor:
+            pending = deque()
+            for chunk in iter_chunks(iterable, chunk_size):
+                pending.append(executor.submit(_run_chunk, method, chunk))
+                if len(pending) >= workers * 2:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+    def scan_many(self, iterable, workers=None, chunk_size=500):
+        """Yields find_profanity() result for each text of iterable"""
+        return self.map_many("find_profanity", iterable, workers, chunk_size)
+
+    def censor_many(self, iterable, workers=None, chunk_size=500):
+        """Yields censored text for each text of iterable"""
+        return self.map_many("censor", iterable, workers, chunk_size)
 
     def is_clean(self, input_text):
         """Returns True if input_text doesn't contain any profane words, False otherwise."""
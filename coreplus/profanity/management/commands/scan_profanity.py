@@ -0,0 +1,88 @@
+from collections import deque
+
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist
+from django.core.management.base import BaseCommand, CommandError
+
+from coreplus.profanity.extras import ProfanityFilter
+from coreplus.utils.iterables import iter_chunks
+
+
+class Command(BaseCommand):
+    help = "Scans a model text field for profanity and optionally flags rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "model",
+            help="Model to scan, in app_label.ModelName format.",
+        )
+        parser.add_argument(
+            "field",
+            help="Text field to scan.",
+        )
+        parser.add_argument(
+            "--flag-field",
+            dest="flag_field",
+            default=None,
+            help="Boolean field set to True for profane rows, False otherwise.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            dest="chunk_size",
+            type=int,
+            default=2000,
+            help="Rows fetched and flagged per database round-trip.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Scan with a pool of worker processes.",
+        )
+
+    def get_field(self, model, name):
+        try:
+            return model._meta.get_field(name)
+        except FieldDoesNotExist as exc:
+            raise CommandError(exc)
+
+    def handle(self, *args, **options):
+        try:
+            model = apps.get_model(options["model"])
+        except (LookupError, ValueError) as exc:
+            raise CommandError(exc)
+        field = self.get_field(model, options["field"])
+        flag_field = options["flag_field"]
+        if flag_field is not None:
+            flag_field = self.get_field(model, flag_field).attname
+
+        chunk_size = options["chunk_size"]
+        queryset = model._default_manager.order_by()
+        rows = queryset.values_list("pk", field.attname).iterator(chunk_size)
+        pks = deque()
+
+        def texts():
+            for pk, text in rows:
+                pks.append(pk)
+                yield text or ""
+
+        pf = ProfanityFilter()
+        results = pf.scan_many(texts(), workers=options["workers"])
+        scanned = 0
+        flagged = 0
+        for chunk in iter_chunks(results, chunk_size):
+            profane = []
+            clean = []
+            for result in chunk:
+                pk = pks.popleft()
+                if result is None:
+                    clean.append(pk)
+                else:
+                    profane.append(pk)
+            scanned += len(chunk)
+            flagged += len(profane)
+            if flag_field is not None:
+                queryset.filter(pk__in=profane).update(**{flag_field: True})
+                queryset.filter(pk__in=clean).update(**{flag_field: False})
+
+        self.stdout.write("Scanned %s rows, %s profane." % (scanned, flagged))
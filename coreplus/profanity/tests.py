@@ -1,6 +1,13 @@
+from io import StringIO
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
 from django.test import TestCase, tag
 
+from example.app.models import Post
+
 from .extras import ProfanityFilter
+from .validators import validate_is_profane
 
 
 class ProfanityTestCase(TestCase):
@@ -12,3 +19,62 @@ class ProfanityTestCase(TestCase):
     def test_profanity_filter_in_text(self):
         cencored = self.profanity.censor("iih, fucker boy")
         self.assertEqual(cencored, "iih, ****** boy")
+
+    @tag("profanity_test")
+    def test_profanity_filter_word_list_changes(self):
+        self.profanity.define_words(["durian"])
+        self.assertEqual(self.profanity.censor("Durians and fuck"), "******* and fuck")
+        self.profanity.append_words([r"bi\+ch"])
+        self.assertEqual(self.profanity.censor("durian bi+ch"), "****** *****")
+        self.profanity.restore_words()
+        self.assertEqual(self.profanity.censor("durian fuck"), "durian ****")
+
+    @tag("profanity_test")
+    def test_profanity_filter_find_profanity(self):
+        self.assertEqual(
+            self.profanity.find_profanity("iih, fucker boy fuck"), ("fucker", (5, 11))
+        )
+        self.assertIsNone(self.profanity.find_profanity("iih, nice boy"))
+        self.assertTrue(self.profanity.is_profane("iih, fucker boy"))
+        with self.assertRaises(ValidationError):
+            validate_is_profane("iih, fucker boy")
+        validate_is_profane("iih, nice boy")
+
+    @tag("profanity_test")
+    def test_profanity_filter_many(self):
+        texts = ["iih, fucker boy", "nice boy"] * 3
+        censored = ["iih, ****** boy", "nice boy"] * 3
+        self.assertEqual(list(self.profanity.censor_many(iter(texts))), censored)
+        self.assertEqual(
+            list(self.profanity.censor_many(texts, workers=2, chunk_size=2)), censored
+        )
+        results = list(self.profanity.scan_many(texts))
+        self.assertEqual(results[:2], [("fucker", (5, 11)), None])
+
+    @tag("profanity_test")
+    def test_scan_profanity_command(self):
+        Post.objects.create(content="iih, fucker boy")
+        Post.objects.create(content="nice boy")
+        out = StringIO()
+        call_command("scan_profanity", "app.Post", "content", stdout=out)
+        self.assertIn("Scanned 2 rows, 1 profane.", out.getvalue())
+        self.assertFalse(Post.objects.filter(is_profane=True).exists())
+
+    @tag("profanity_test")
+    def test_scan_profanity_command_flag_field(self):
+        profane = Post.objects.create(content="iih, fucker boy")
+        clean = Post.objects.create(content="nice boy", is_profane=True)
+        call_command(
+            "scan_profanity",
+            "app.Post",
+            "content",
+            flag_field="is_profane",
+            chunk_size=1,
+            stdout=StringIO(),
+        )
+        self.assertEqual(
+            list(Post.objects.filter(is_profane=True).values_list("pk", flat=True)),
+            [profane.pk],
+        )
+        clean.refresh_from_db()
+        self.assertFalse(clean.is_profane)
@@ -6,5 +6,5 @@ pf = ProfanityFilter()
 
 
 def validate_is_profane(value):
-    if pf.is_profane(value) is True:
+    if pf.find_profanity(value) is not None:
         raise ValidationError("Please remove any profanity/swear words.")
@@ -0,0 +1,150 @@
+import copy
+import logging
+import time
+
+from django.core.cache import caches
+from django.db import transaction
+
+from ..configs import coreplus_configs as configs
+from ..utils.caches import LRUCache
+
+logger = logging.getLogger("engine")
+
+
+def get_cache_size():
+    return configs.SETTINGS_CACHE_SIZE
+
+
+class SettingCache(LRUCache):
+    """
+    Process local tier in front of the SETTINGS_CACHE_ALIAS Django cache,
+    keyed by (model label, site id). Entries expire after
+    SETTINGS_LOCAL_CACHE_TIMEOUT so saves made by other processes show
+    up, saves made by this process discard them right away.
+    """
+
+    def __init__(self, maxsize=None):
+        super().__init__(maxsize or get_cache_size)
+
+    def get_instance(self, key):
+        entry = self.get(key)
+        if entry is None:
+            return None
+        expires, instance = entry
+        if expires < time.monotonic():
+            self.pop(key)
+            return None
+        return instance
+
+    def set_instance(self, key, instance):
+        expires = time.monotonic() + configs.SETTINGS_LOCAL_CACHE_TIMEOUT
+        self.set(key, (expires, instance))
+
+
+setting_cache = SettingCache()
+
+# Read only snapshots built from the cached rows, shared by all threads
+snapshot_cache = SettingCache()
+
+
+def get_cache_key(model, site_id):
+    return "coreplus.settings.%s.%s" % (model._meta.label_lower, site_id)
+
+
+def get_backend():
+    return caches[configs.SETTINGS_CACHE_ALIAS]
+
+
+def call_backend(method, *args, default=None):
+    """
+    Call ``method`` of the Django cache backend, errors are logged and
+    ``default`` is returned so settings are read from the database.
+    """
+    try:
+        return getattr(get_backend(), method)(*args)
+    except Exception as exc:
+        logger.error("Error calling the settings cache %s: %s", method, exc)
+        return default
+
+
+def get_cached_setting(model, site_id):
+    """
+    Return a copy of the cached setting of ``model`` for ``site_id``, or
+    None. Copies keep request specific attributes off the shared instance.
+    """
+    if not configs.SETTINGS_CACHE:
+        return None
+    key = (model._meta.label_lower, site_id)
+    instance = setting_cache.get_instance(key)
+    if instance is None:
+        instance = call_backend("get", get_cache_key(model, site_id))
+        if instance is None:
+            return None
+        setting_cache.set_instance(key, instance)
+    return copy.copy(instance)
+
+
+def get_cached_settings(models, site_id):
+    """
+    Return a {model: instance} dict of the cached settings of ``models``
+    for ``site_id``, the Django cache is queried once for the models
+    missing from the local tier.
+    """
+    if not configs.SETTINGS_CACHE:
+        return {}
+    instances = {}
+    missing = {}
+    for model in models:
+        instance = setting_cache.get_instance((model._meta.label_lower, site_id))
+        if instance is None:
+            missing[get_cache_key(model, site_id)] = model
+        else:
+            instances[model] = instance
+    if missing:
+        cached = call_backend("get_many", list(missing), default={})
+        for key, instance in cached.items():
+            model = missing[key]
+            setting_cache.set_instance((model._meta.label_lower, site_id), instance)
+            instances[model] = instance
+    return {model: copy.copy(instance) for model, instance in instances.items()}
+
+
+def set_cached_settings(instances):
+    if not configs.SETTINGS_CACHE or not instances:
+        return
+    data = {}
+    for instance in instances:
+        instance = copy.copy(instance)
+        model = instance.__class__
+        data[get_cache_key(model, instance.site_id)] = instance
+        setting_cache.set_instance(
+            (model._meta.label_lower, instance.site_id), instance
+        )
+    call_backend("set_many", data, configs.SETTINGS_CACHE_TIMEOUT)
+
+
+def set_cached_setting(instance):
+    if not configs.SETTINGS_CACHE:
+        return
+    model = instance.__class__
+    instance = copy.copy(instance)
+    key = get_cache_key(model, instance.site_id)
+    call_backend("set", key, instance, configs.SETTINGS_CACHE_TIMEOUT)
+    setting_cache.set_instance((model._meta.label_lower, instance.site_id), instance)
+
+
+def delete_cached_setting(model, site_id):
+    setting_cache.pop((model._meta.label_lower, site_id))
+    snapshot_cache.pop((model._meta.label_lower, site_id))
+    call_backend("delete", get_cache_key(model, site_id))
+
+
+def invalidate_setting_cache(sender, instance, using=None, **kwargs):
+    """
+    Drop the cached setting now and again once the transaction commits,
+    a request reading the old row before the commit could cache it again
+    in between.
+    """
+    site_id = instance.site_id
+    delete_cached_setting(sender, site_id)
+    transaction.on_commit(lambda: delete_cached_setting(sender, site_id), using=using)
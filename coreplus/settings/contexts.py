@@ -1,8 +1,35 @@
+from django.conf import settings as django_settings
 from django.contrib.sites.models import Site
 from django.contrib.sites.shortcuts import get_current_site
 from django.utils.functional import SimpleLazyObject
 
+from ..configs import coreplus_configs as configs
 from .registries import registry
+from .snapshots import get_snapshot, get_snapshots
+
+
+def get_request_site(request):
+    """
+    Resolve the site of the request once, it is kept on ``request.site``
+    like CurrentSiteMiddleware does. The sites framework caches it per
+    process so this is not a query on warm workers.
+    """
+    site = getattr(request, "site", None)
+    if site is None:
+        site = request.site = get_current_site(request)
+    return site
+
+
+def get_default_site(request=None):
+    """
+    Return the SITE_ID site, or the site of the request when SITE_ID is
+    not set, and the first site as a last resort.
+    """
+    if getattr(django_settings, "SITE_ID", None):
+        return Site.objects.get_current()
+    if request is not None:
+        return get_request_site(request)
+    return Site.objects.first()
 
 
 class SettingsProxy(dict):
@@ -20,10 +47,29 @@ class SettingsProxy(dict):
     def __str__(self):
         return "SettingsProxy"
 
+    def get_site(self):
+        if isinstance(self.request_or_site, Site):
+            return self.request_or_site
+        return get_request_site(self.request_or_site)
+
+    def prefetch(self, models=None):
+        """
+        Populate the proxy with every registered setting, or ``models``,
+        in one batched pass instead of a lookup per setting. Without the
+        settings cache every registered setting would be queried on each
+        render, so settings are left to load lazily on access instead.
+        """
+        if models is None and not configs.SETTINGS_CACHE:
+            return self
+        for Model, snapshot in get_snapshots(self.get_site(), models).items():
+            module = self[Model._meta.app_label]
+            module[Model._meta.model_name] = snapshot
+        return self
+
 
 class SettingModuleProxy(dict):
     """
-    Get a setting instance using proxy['modelname']
+    Get a setting snapshot using proxy['modelname']
     """
 
     def __init__(self, request_or_site, app_label):
@@ -31,7 +77,7 @@ class SettingModuleProxy(dict):
         self.request_or_site = request_or_site
 
     def __getitem__(self, model_name):
-        """Get a setting instance for a model"""
+        """Get a setting snapshot for a model"""
         # Model names are treated as case-insensitive
         return super().__getitem__(model_name.lower())
 
@@ -42,23 +88,22 @@ class SettingModuleProxy(dict):
 
     def get_setting(self, model_name):
         """
-        Get a setting instance
+        Get the shared, read only snapshot of a setting
         """
         Model = registry.get_by_natural_key(self.app_label, model_name)
         if Model is None:
             return None
 
         if isinstance(self.request_or_site, Site):
-            return Model.for_site(self.request_or_site)
-        # Utilises cached value on request if set
-        return Model.for_request(self.request_or_site)
+            return get_snapshot(Model, self.request_or_site)
+        return get_snapshot(Model, get_request_site(self.request_or_site))
 
     def __str__(self):
         return "SettingsModuleProxy({0})".format(self.app_label)
 
 
 def settings(request):
-    site = SimpleLazyObject(lambda: get_current_site(request))
+    site = SimpleLazyObject(lambda: get_request_site(request))
     protocol = "https" if request.is_secure() else "http"
 
     # delay site query until settings values are needed
@@ -68,7 +113,7 @@ def settings(request):
             # so no settings can be idenfified
             return {}
         else:
-            return SettingsProxy(request)
+            return SettingsProxy(request).prefetch()
 
     return {
         "site": site,
@@ -3,7 +3,9 @@ from django.db import models
 from django.forms import modelform_factory
 from django.utils.translation import gettext_lazy as _
 
+from .caches import get_cached_setting, set_cached_setting
 from .registries import register_setting
+from .snapshots import get_snapshot
 
 
 class BaseSetting(models.Model):
@@ -49,12 +51,25 @@ class BaseSetting(models.Model):
     @classmethod
     def for_site(cls, site):
         """
-        Get or create an instance of this setting for the site.
+        Get or create an instance of this setting for the site, served
+        from the settings cache when possible.
         """
+        instance = get_cached_setting(cls, site.pk)
+        if instance is not None:
+            return instance
         queryset = cls.base_queryset()
         instance, created = queryset.get_or_create(site=site)
+        set_cached_setting(instance)
         return instance
 
+    @classmethod
+    def snapshot_for_site(cls, site):
+        """
+        Get the immutable snapshot of this setting for the site, it is
+        built once from the cached row and shared across requests.
+        """
+        return get_snapshot(cls, site)
+
     @classmethod
     def for_request(cls, request):
         """
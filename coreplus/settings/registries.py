@@ -1,8 +1,11 @@
 from django.apps import apps
+from django.db import IntegrityError, transaction
+from django.db.models.signals import post_delete, post_save
 from django.urls.base import reverse
 
 from coreplus import hooks
 
+from .caches import get_cached_settings, invalidate_setting_cache, set_cached_settings
 from .permissions import user_can_edit_setting_type
 
 
@@ -17,6 +20,10 @@ class Registry(list):
             return model
         self.append(model)
 
+        # Drop cached instances when the setting changes
+        post_save.connect(invalidate_setting_cache, sender=model)
+        post_delete.connect(invalidate_setting_cache, sender=model)
+
         # Register a new menu item in the settings menu
         @hooks.register("REGISTER_SETTINGS_MENU_ITEM")
         def settings_menu_hook(request):
@@ -66,6 +73,40 @@ class Registry(list):
             return None
         return Model
 
+    def create_for_site(self, queryset, site):
+        """
+        Create the absent setting of ``queryset`` for the site, the row
+        created by a concurrent request is returned when it wins the race.
+        """
+        try:
+            with transaction.atomic(using=queryset.db):
+                return queryset.create(site=site)
+        except IntegrityError:
+            return queryset.get(site=site)
+
+    def prefetch_for_site(self, site, models=None):
+        """
+        Load the settings of every registered model, or of ``models``, for
+        the site and return a {model: instance} dict. Cached settings are
+        read in a single cache round trip, the missing ones are selected
+        with one query per table, only the absent rows are created, and
+        they are cached together.
+        """
+        models = list(self if models is None else models)
+        instances = get_cached_settings(models, site.pk)
+        missing = []
+        for model in models:
+            if model in instances:
+                continue
+            queryset = model.base_queryset()
+            instance = next(iter(queryset.filter(site=site)[:1]), None)
+            if instance is None:
+                instance = self.create_for_site(queryset, site)
+            instances[model] = instance
+            missing.append(instance)
+        set_cached_settings(missing)
+        return instances
+
 
 registry = Registry()
 register_setting = registry.register_decorator
@@ -0,0 +1,95 @@
+import copy
+import threading
+
+from ..configs import coreplus_configs as configs
+from .caches import snapshot_cache
+from .registries import registry
+
+_snapshot_classes = {}
+_snapshot_classes_lock = threading.Lock()
+
+
+class SettingSnapshot:
+    """
+    Immutable view of a setting row. Field values live in slots, anything
+    else, e.g. relations and methods, is read from a private copy of the
+    instance, so a snapshot can be shared across requests and threads.
+    """
+
+    __slots__ = ("_instance",)
+    fields = ()
+
+    def __init__(self, instance):
+        object.__setattr__(self, "_instance", copy.copy(instance))
+        for name in self.fields:
+            object.__setattr__(self, name, getattr(instance, name))
+
+    def __getattr__(self, name):
+        if name == "_instance" or name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self._instance, name)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("%s is read only" % self.__class__.__name__)
+
+    def __delattr__(self, name):
+        raise AttributeError("%s is read only" % self.__class__.__name__)
+
+    def __repr__(self):
+        return "<%s: %s>" % (self.__class__.__name__, self._instance)
+
+    def __str__(self):
+        return str(self._instance)
+
+
+def get_snapshot_class(model):
+    """Return the SettingSnapshot subclass with a slot per concrete field"""
+    try:
+        return _snapshot_classes[model]
+    except KeyError:
+        pass
+    with _snapshot_classes_lock:
+        if model not in _snapshot_classes:
+            fields = tuple(field.attname for field in model._meta.concrete_fields)
+            _snapshot_classes[model] = type(
+                "%sSnapshot" % model.__name__,
+                (SettingSnapshot,),
+                {"__slots__": fields, "fields": fields},
+            )
+        return _snapshot_classes[model]
+
+
+def get_snapshot(model, site, instance=None):
+    """
+    Return the shared snapshot of ``model`` for the site, ``instance`` is
+    used instead of looking the setting up when given.
+    """
+    key = (model._meta.label_lower, site.pk)
+    snapshot = snapshot_cache.get_instance(key)
+    if snapshot is None:
+        if instance is None:
+            instance = model.for_site(site)
+        snapshot = get_snapshot_class(model)(instance)
+        if configs.SETTINGS_CACHE:
+            snapshot_cache.set_instance(key, snapshot)
+    return snapshot
+
+
+def get_snapshots(site, models=None):
+    """
+    Return a {model: snapshot} dict of every registered setting, or of
+    ``models``, the missing ones are loaded in one batched pass.
+    """
+    models = list(registry if models is None else models)
+    snapshots = {}
+    missing = []
+    for model in models:
+        snapshot = snapshot_cache.get_instance((model._meta.label_lower, site.pk))
+        if snapshot is None:
+            missing.append(model)
+        else:
+            snapshots[model] = snapshot
+    if missing:
+        for model, instance in registry.prefetch_for_site(site, missing).items():
+            snapshots[model] = get_snapshot(model, site, instance)
+    return snapshots
@@ -1,10 +1,9 @@
-from django.contrib.sites.models import Site
 from django.template import Library, Node
 from django.template.defaulttags import token_kwargs
 
 from coreplus import hooks
 
-from ..contexts import SettingsProxy
+from ..contexts import SettingsProxy, get_default_site, get_request_site
 
 # from ..permissions import user_can_edit_setting_type
 
@@ -18,11 +17,12 @@ class GetSettingsNode(Node):
 
     @staticmethod
     def get_settings_object(context, use_default_site=True):
+        request = context.get("request")
         if use_default_site:
-            site = Site.objects.first()
-            return SettingsProxy(site)
-        if "request" in context:
-            return SettingsProxy(context["request"])
+            site = get_default_site(request)
+            return SettingsProxy(site).prefetch()
+        if request is not None:
+            return SettingsProxy(get_request_site(request)).prefetch()
 
         raise RuntimeError(
             "No request found in context, and use_default_site flag not set"
@@ -48,6 +48,4 @@ def get_settings(parser, token):
 @register.simple_tag(takes_context=True)
 def get_settings_list(context, **kwargs):
     request = context["request"]
-    funcs = hooks.get_hooks("REGISTER_SETTINGS_MENU_ITEM")
-    menu_list = [func(request) for func in funcs if func(request) is not None]
-    return menu_list
+    return hooks.run_hooks("REGISTER_SETTINGS_MENU_ITEM", request)
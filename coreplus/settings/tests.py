@@ -1,3 +1,150 @@
-from django.test import TestCase  # NOQA
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, tag
+
+from .caches import setting_cache
+from .contexts import SettingsProxy
+from .models import GeneralSetting
+from .registries import registry
+
+
+class SettingCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        setting_cache.clear()
+        self.site = Site.objects.get_current()
+
+    @tag("settings_unit_test")
+    def test_for_site_is_cached(self):
+        setting = GeneralSetting.for_site(self.site)
+        with self.assertNumQueries(0):
+            self.assertEqual(GeneralSetting.for_site(self.site).pk, setting.pk)
+
+        # The database tier survives a cold local tier
+        setting_cache.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(GeneralSetting.for_site(self.site).pk, setting.pk)
+
+    @tag("settings_unit_test")
+    def test_for_request_is_cached(self):
+        GeneralSetting.for_site(self.site)
+        with self.assertNumQueries(0):
+            request = RequestFactory().get("/")
+            setting = GeneralSetting.for_request(request)
+            self.assertIs(GeneralSetting.for_request(request), setting)
+        # Request attributes stay off the shared instance
+        self.assertFalse(hasattr(GeneralSetting.for_site(self.site), "_request"))
+
+    @tag("settings_unit_test")
+    def test_save_and_delete_invalidate(self):
+        setting = GeneralSetting.for_site(self.site)
+        setting.site_name = "Changed"
+        setting.save()
+        self.assertEqual(GeneralSetting.for_site(self.site).site_name, "Changed")
+
+        pk = setting.pk
+        setting.delete()
+        setting = GeneralSetting.for_site(self.site)
+        self.assertNotEqual(setting.pk, pk)
+        self.assertIsNone(setting.site_name)
+
+    @tag("settings_unit_test")
+    def test_invalidate_on_commit(self):
+        setting = GeneralSetting.for_site(self.site)
+        key = (GeneralSetting._meta.label_lower, self.site.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            setting.site_name = "Committed"
+            setting.save()
+            # A concurrent request caching the old row before the commit
+            setting_cache.set_instance(key, setting)
+            self.assertIsNotNone(setting_cache.get_instance(key))
+        self.assertIsNone(setting_cache.get_instance(key))
+
+    @tag("settings_unit_test")
+    def test_cache_backend_error(self):
+        setting = GeneralSetting.for_site(self.site)
+        setting_cache.clear()
+        backend = "django.core.cache.backends.locmem.LocMemCache"
+        with mock.patch("%s.get" % backend, side_effect=ConnectionError), mock.patch(
+            "%s.get_many" % backend, side_effect=ConnectionError
+        ), mock.patch("%s.set" % backend, side_effect=ConnectionError):
+            with self.assertLogs("engine", "ERROR"):
+                self.assertEqual(GeneralSetting.for_site(self.site).pk, setting.pk)
+                setting_cache.clear()
+                instances = registry.prefetch_for_site(self.site)
+            self.assertEqual(instances[GeneralSetting].pk, setting.pk)
+
+    @tag("settings_unit_test")
+    def test_cache_can_be_disabled(self):
+        with self.settings(COREPLUS={"SETTINGS_CACHE": False}):
+            GeneralSetting.for_site(self.site)
+            with self.assertNumQueries(1):
+                GeneralSetting.for_site(self.site)
+
+    @tag("settings_unit_test")
+    def test_prefetch_for_site(self):
+        instances = registry.prefetch_for_site(self.site)
+        self.assertEqual(set(instances), set(registry))
+        setting_cache.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(registry.prefetch_for_site(self.site), instances)
+
+            request = RequestFactory().get("/")
+            proxy = SettingsProxy(request).prefetch()
+            setting = proxy["coreplus_settings"]["GeneralSetting"]
+            self.assertEqual(setting.pk, instances[GeneralSetting].pk)
+
+    @tag("settings_unit_test")
+    def test_prefetch_for_site_cold_cache(self):
+        GeneralSetting.objects.filter(site=self.site).delete()
+        with self.settings(COREPLUS={"SETTINGS_CACHE": False}):
+            instances = registry.prefetch_for_site(self.site)
+            self.assertEqual(instances[GeneralSetting].site, self.site)
+            with self.assertNumQueries(len(registry)):
+                self.assertEqual(registry.prefetch_for_site(self.site), instances)
+
+            request = RequestFactory().get("/")
+            with self.assertNumQueries(0):
+                proxy = SettingsProxy(request).prefetch()
+            setting = proxy["coreplus_settings"]["GeneralSetting"]
+            self.assertEqual(setting.pk, instances[GeneralSetting].pk)
+
+    @tag("settings_unit_test")
+    def test_snapshot(self):
+        setting = GeneralSetting.for_site(self.site)
+        setting.site_name = "Snapshot"
+        setting.save()
+
+        snapshot = GeneralSetting.snapshot_for_site(self.site)
+        with self.assertNumQueries(0):
+            self.assertIs(GeneralSetting.snapshot_for_site(self.site), snapshot)
+            self.assertEqual(snapshot.site_name, "Snapshot")
+            self.assertEqual(snapshot.pk, setting.pk)
+        with self.assertRaises(AttributeError):
+            snapshot.site_name = "Changed"
+        with self.assertRaises(AttributeError):
+            snapshot.__dict__
+        self.assertEqual(snapshot.site, self.site)
+
+        setting.site_name = "Changed"
+        setting.save()
+        snapshot = GeneralSetting.snapshot_for_site(self.site)
+        self.assertEqual(snapshot.site_name, "Changed")
+
+    @tag("settings_unit_test")
+    def test_get_settings_tag(self):
+        template = Template(
+            "{% load settings_tags %}{% get_settings %}"
+            "{{ settings.coreplus_settings.GeneralSetting.site_name }}"
+        )
+        setting = GeneralSetting.for_site(self.site)
+        setting.site_name = "Tagged"
+        setting.save()
+        GeneralSetting.snapshot_for_site(self.site)
+        request = RequestFactory().get("/")
+        with self.assertNumQueries(0):
+            self.assertEqual(template.render(Context({"request": request})), "Tagged")
+            self.assertEqual(template.render(Context({"request": request})), "Tagged")
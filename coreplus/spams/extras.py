@@ -1,31 +1,232 @@
+import hashlib
+import logging
+import os
 import pickle
+import re
+import threading
 
-from langdetect import detect
+import numpy as np
+from langdetect import DetectorFactory, detect
+from langdetect.lang_detect_exception import LangDetectException
+
+from ..configs import coreplus_configs as configs
+from ..utils.caches import LRUCache
+
+logger = logging.getLogger("engine")
+
+SPAM_MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+SPAM_MODEL_NAME = "model_and_vectorizer_with_pickle(%s)"
+SPAM_MODEL_LANGUAGES = ["en", "id"]
+
+# Loaded (vectorizer, model) pairs shared by every SpamFilter in the process
+_spam_models = {}
+_spam_models_lock = threading.Lock()
+
+# Resolved (path, mmap) for each (lang, model_dir, mmap) asked for
+_model_paths = {}
+
+
+def get_model_dir():
+    return configs.SPAM_MODEL_DIR or SPAM_MODEL_DIR
+
+
+def get_model_path(lang, model_dir=None, mmap=False):
+    """
+    Returns the absolute path of the ``lang`` model artefact, the pickle
+    or, with ``mmap``, the uncompressed joblib dump of it.
+    """
+    extension = "joblib" if mmap else "pkl"
+    filename = "%s.%s" % (SPAM_MODEL_NAME % lang, extension)
+    return os.path.join(model_dir or get_model_dir(), filename)
+
+
+def resolve_model_path(lang, model_dir, mmap):
+    """
+    Returns (path, mmap) of the artefact to load, falling back to the
+    pickle when the joblib dump is missing. Resolved once per arguments.
+    """
+    key = (lang, model_dir, mmap)
+    try:
+        return _model_paths[key]
+    except KeyError:
+        pass
+    path = get_model_path(lang, model_dir, mmap)
+    if mmap and not os.path.exists(path):
+        logger.warning("%s not found, run dump_spam_models to create it.", path)
+        path = get_model_path(lang, model_dir)
+        mmap = False
+    _model_paths[key] = (path, mmap)
+    return path, mmap
+
+
+def load_model(lang, model_dir=None, mmap=None):
+    """
+    Load (vectorizer, model) for ``lang`` once per process. With ``mmap``
+    the model arrays are memory-mapped read only from the joblib dump, so
+    workers forked from a preloaded parent share the pages copy-on-write.
+    """
+    if mmap is None:
+        mmap = configs.SPAM_MODEL_MMAP
+    path, mmap = resolve_model_path(lang, model_dir or get_model_dir(), mmap)
+    try:
+        return _spam_models[path]
+    except KeyError:
+        pass
+    with _spam_models_lock:
+        if path not in _spam_models:
+            if mmap:
+                import joblib
+
+                _spam_models[path] = joblib.load(path, mmap_mode="r")
+            else:
+                with open(path, "rb") as f:
+                    _spam_models[path] = pickle.load(f)
+        return _spam_models[path]
+
+
+def dump_models(output_dir, source_dir=None):
+    """
+    Write the joblib dumps used by memory-mapped loading to ``output_dir``,
+    read from the pickles of ``source_dir``, the packaged ones by default.
+    """
+    import joblib
+
+    paths = []
+    for lang in SPAM_MODEL_LANGUAGES:
+        path = get_model_path(lang, output_dir, mmap=True)
+        source = load_model(lang, source_dir or SPAM_MODEL_DIR, mmap=False)
+        joblib.dump(source, path)
+        paths.append(path)
+    return paths
+
+
+class LanguageRouter:
+    """
+    Route a text to the language of the model that classifies it. Obvious
+    cases are decided by a cheap heuristic, texts without latin letters go
+    to the default language and texts with clear English or Indonesian
+    stop words skip detection. The rest is left to a seeded, deterministic
+    langdetect.
+    """
+
+    default_language = "id"
+    seed = 0
+    stop_words = {
+        "en": {"the", "and", "is", "are", "of", "to", "you", "this", "that", "with"},
+        "id": {"yang", "dan", "di", "ke", "dari", "ini", "itu", "tidak", "dengan"},
+    }
+    word_pattern = re.compile(r"[a-z]+")
+    min_stop_words = 2
+
+    def __init__(self):
+        DetectorFactory.seed = self.seed
+
+    def guess(self, text):
+        """Returns a language for obvious cases, None otherwise"""
+        words = self.word_pattern.findall(text.lower())
+        if not words:
+            return self.default_language
+        hits = {
+            lang: sum(word in stop_words for word in words)
+            for lang, stop_words in self.stop_words.items()
+        }
+        matched = [lang for lang, count in hits.items() if count]
+        if len(matched) == 1 and hits[matched[0]] >= self.min_stop_words:
+            return matched[0]
+        return None
+
+    def detect(self, text):
+        try:
+            return detect(text)
+        except LangDetectException:
+            return self.default_language
+
+    def route(self, text):
+        lang = self.guess(text) or self.detect(text)
+        return lang if lang in SPAM_MODEL_LANGUAGES else self.default_language
 
 
 class SpamFilter:
     def __init__(self, **kwargs):
-        # load model and vectorizer
-        with open(
-            "coreplus/spams/static/model_and_vectorizer_with_pickle(en).pkl", "rb"
-        ) as f:
-            vectorizer_en, model_en = pickle.load(f)
-        self.vectorizer_en = vectorizer_en
-        self.model_en = model_en
-        with open(
-            "coreplus/spams/static/model_and_vectorizer_with_pickle(id).pkl", "rb"
-        ) as f:
-            vectorizer_id, model_id = pickle.load(f)
-        self.vectorizer_id = vectorizer_id
-        self.model_id = model_id
+        # Models are loaded on first use
+        self.model_dir = kwargs.get("model_dir")
+        self.mmap = kwargs.get("mmap")
+        self.router = kwargs.get("router") or configs.SPAM_LANGUAGE_ROUTER()
+
+        # Results of already classified texts, keyed by content hash
+        cache_size = kwargs.get("cache_size", configs.SPAM_CACHE_SIZE)
+        self.cache = LRUCache(cache_size) if cache_size else None
+
+    def get_model(self, lang):
+        """Returns (vectorizer, model) for lang"""
+        return load_model(lang, self.model_dir, self.mmap)
+
+    def load(self):
+        """Load every model now, e.g. in a preloading gunicorn master"""
+        for lang in SPAM_MODEL_LANGUAGES:
+            self.get_model(lang)
+
+    @property
+    def vectorizer_en(self):
+        return self.get_model("en")[0]
+
+    @property
+    def model_en(self):
+        return self.get_model("en")[1]
+
+    @property
+    def vectorizer_id(self):
+        return self.get_model("id")[0]
+
+    @property
+    def model_id(self):
+        return self.get_model("id")[1]
+
+    def get_language(self, text):
+        """Returns the language of the model used to classify text"""
+        return self.router.route(text)
+
+    def get_cache_key(self, text):
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
 
     def is_spam(self, text):
-        lang = detect(text)
-        if lang == "en":
-            text_vector = self.vectorizer_en.transform([text])
-            res = self.model_en.predict(text_vector)
-        else:
-            text_vector = self.vectorizer_id.transform([text])
-            res = self.model_id.predict(text_vector)
+        if self.cache is not None:
+            key = self.get_cache_key(text)
+            res = self.cache.get(key)
+            if res is not None:
+                return res
+        vectorizer, model = self.get_model(self.get_language(text))
+        text_vector = vectorizer.transform([text])
         # return 1 = spam, 0 = normal
-        return res[0]
+        res = model.predict(text_vector)[0]
+        if self.cache is not None:
+            self.cache.set(key, res)
+        return res
+
+    def is_spam_many(self, texts):
+        """
+        Classify texts in bulk, texts are grouped by language and each
+        group is transformed and predicted in one vectorized call.
+        Returns an array of labels in input order, 1 = spam, 0 = normal.
+        """
+        texts = list(texts)
+        labels = np.zeros(len(texts), dtype=np.int64)
+        keys = [None] * len(texts)
+        groups = {}
+        for index, text in enumerate(texts):
+            if self.cache is not None:
+                keys[index] = self.get_cache_key(text)
+                res = self.cache.get(keys[index])
+                if res is not None:
+                    labels[index] = res
+                    continue
+            groups.setdefault(self.get_language(text), []).append(index)
+
+        for lang, indexes in groups.items():
+            vectorizer, model = self.get_model(lang)
+            text_vector = vectorizer.transform([texts[i] for i in indexes])
+            labels[indexes] = model.predict(text_vector)
+            if self.cache is not None:
+                for index in indexes:
+                    self.cache.set(keys[index], labels[index])
+        return labels
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from coreplus.configs import coreplus_configs as configs
+from coreplus.spams.extras import dump_models
+
+
+class Command(BaseCommand):
+    help = "Dumps spam models to joblib files that can be memory-mapped."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            dest="output_dir",
+            default=None,
+            help="Directory to write to, defaults to COREPLUS SPAM_MODEL_DIR.",
+        )
+        parser.add_argument(
+            "--source",
+            dest="source_dir",
+            default=None,
+            help="Directory of the pickled models, defaults to the packaged ones.",
+        )
+
+    def handle(self, *args, **options):
+        output_dir = options["output_dir"] or configs.SPAM_MODEL_DIR
+        if not output_dir:
+            raise CommandError("Pass --output or set COREPLUS SPAM_MODEL_DIR.")
+        for path in dump_models(output_dir, source_dir=options["source_dir"]):
+            self.stdout.write("Dumped %s" % path)
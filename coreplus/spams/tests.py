@@ -1,6 +1,13 @@
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
 from django.test import TestCase, tag
 
-from .extras import SpamFilter
+import numpy as np
+
+from .extras import LanguageRouter, SpamFilter, get_model_path, resolve_model_path
 from .validators import validate_is_spam
 
 
@@ -28,3 +35,70 @@ class SpamTestCase(TestCase):
     @tag("spam_test")
     def test_english_spam_validate(self):
         validate_is_spam("isnt just possible now")
+
+    @tag("spam_test")
+    def test_memory_mapped_spam_models(self):
+        with tempfile.TemporaryDirectory() as model_dir:
+            call_command("dump_spam_models", output=model_dir, stdout=StringIO())
+            spam = SpamFilter(model_dir=model_dir, mmap=True)
+            vectorizer, model = spam.get_model("en")
+            self.assertIsInstance(model.feature_log_prob_, np.memmap)
+            res = spam.is_spam(
+                "Please like and share our product at https://www.google.com"
+            )
+            self.assertEqual(res, True)
+
+    @tag("spam_test")
+    def test_dump_spam_models_to_model_dir(self):
+        with tempfile.TemporaryDirectory() as model_dir:
+            with self.settings(COREPLUS={"SPAM_MODEL_DIR": model_dir}):
+                call_command("dump_spam_models", stdout=StringIO())
+                path, mmap = resolve_model_path("en", model_dir, True)
+            self.assertTrue(mmap)
+            self.assertEqual(path, get_model_path("en", model_dir, mmap=True))
+        with self.assertRaises(CommandError):
+            call_command("dump_spam_models", stdout=StringIO())
+
+    @tag("spam_test")
+    def test_missing_spam_model_dump_resolved_once(self):
+        with tempfile.TemporaryDirectory() as model_dir:
+            with self.assertLogs("engine", "WARNING") as logs:
+                path, mmap = resolve_model_path("en", model_dir, True)
+            self.assertEqual(len(logs.output), 1)
+            self.assertEqual(path, get_model_path("en", model_dir))
+            self.assertFalse(mmap)
+            with mock.patch("os.path.exists") as exists:
+                self.assertEqual(
+                    resolve_model_path("en", model_dir, True), (path, mmap)
+                )
+            exists.assert_not_called()
+
+    @tag("spam_test")
+    def test_spam_filter_many(self):
+        texts = [
+            "Please like and share our product at https://www.google.com",
+            "isnt just possible now",
+            "bagikan dan sukai produk dari https://www.google.com",
+            "Paket tadi sore mendadak habis.",
+        ]
+        labels = self.spam.is_spam_many(texts)
+        self.assertEqual(labels.tolist(), [1, 0, 1, 0])
+        self.assertEqual(labels.tolist(), [self.spam.is_spam(t) for t in texts])
+        self.assertEqual(len(self.spam.is_spam_many([])), 0)
+
+    @tag("spam_test")
+    def test_language_router(self):
+        router = LanguageRouter()
+        self.assertEqual(router.route("12345 !!!"), "id")
+        self.assertEqual(router.route("это просто тест"), "id")
+        self.assertEqual(router.route("ini produk yang bagus dari kami"), "id")
+        self.assertEqual(router.route("this is the best offer of the year"), "en")
+
+    @tag("spam_test")
+    def test_spam_filter_cache(self):
+        text = "Please like and share our product at https://www.google.com"
+        self.assertEqual(self.spam.is_spam(text), True)
+        with mock.patch.object(self.spam, "get_model") as get_model:
+            self.assertEqual(self.spam.is_spam(text), True)
+            self.assertEqual(self.spam.is_spam_many([text]).tolist(), [1])
+            get_model.assert_not_called()
@@ -0,0 +1,44 @@
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Bounded, thread safe, process local least recently used cache.
+    ``maxsize`` may be a callable, e.g. to read it lazily from settings.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            maxsize = self.maxsize() if callable(self.maxsize) else self.maxsize
+            while len(self._data) > maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
@@ -0,0 +1,11 @@
+from itertools import islice
+
+
+def iter_chunks(iterable, size):
+    """Yields lists of at most ``size`` items from ``iterable``"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
@@ -358,6 +358,158 @@ class SplitField(models.TextField):
         return name, path, args, kwargs
 
 
+def _rendered_field_name(name):
+    return "_%s_rendered" % name
+
+
+def _rendered_source_name(name):
+    return "_%s_rendered_source" % name
+
+
+class MarkdownText:
+    def __init__(self, instance, field_name, rendered_field_name):
+        # store a reference to the instance along with field names,
+        # like SplitText, so assignment stays possible
+        self.instance = instance
+        self.field_name = field_name
+        self.rendered_field_name = rendered_field_name
+
+    # content is read/write
+    @property
+    def content(self):
+        return self.instance.__dict__[self.field_name]
+
+    @content.setter
+    def content(self, val):
+        setattr(self.instance, self.field_name, val)
+
+    # rendered is the sanitized html stored at save time, read only
+    @property
+    def rendered(self):
+        return getattr(self.instance, self.rendered_field_name)
+
+    def __str__(self):
+        return self.content
+
+
+class MarkdownDescriptor:
+    def __init__(self, field):
+        self.field = field
+        self.rendered_field_name = _rendered_field_name(self.field.name)
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            raise AttributeError("Can only be accessed via an instance.")
+        content = instance.__dict__[self.field.name]
+        if content is None:
+            return None
+        return MarkdownText(instance, self.field.name, self.rendered_field_name)
+
+    def __set__(self, obj, value):
+        if isinstance(value, MarkdownText):
+            obj.__dict__[self.field.name] = value.content
+        else:
+            obj.__dict__[self.field.name] = value
+
+
+class MarkdownField(models.TextField):
+    """
+    A TextField storing markdown source along with a denormalized html
+    rendition, produced by ``coreplus.markdown.parse`` (or ``parse_simple``
+    with ``simple=True``) at save time, so reads don't parse anything.
+
+    The source is only parsed again when it changed since it was loaded.
+    ``save(update_fields=[name])`` writes the rendition too, in a second
+    update statement.
+    """
+
+    def __init__(self, *args, **kwargs):
+        # like SplitField, the frozen version of a MarkdownField must not
+        # add the _rendered field again, it is frozen as well.
+        self.add_rendered_field = not kwargs.pop("no_rendered_field", False)
+        self.simple = kwargs.pop("simple", False)
+        super().__init__(*args, **kwargs)
+
+    def contribute_to_class(self, cls, name):
+        self.rendered_field_name = _rendered_field_name(name)
+        self.rendered_source_name = _rendered_source_name(name)
+        if self.add_rendered_field and not cls._meta.abstract:
+            rendered_field = models.TextField(editable=False, blank=True, default="")
+            cls.add_to_class(self.rendered_field_name, rendered_field)
+            models.signals.post_init.connect(self._save_source, sender=cls)
+            models.signals.post_save.connect(self._save_rendered, sender=cls)
+        super().contribute_to_class(cls, name)
+        setattr(cls, self.name, MarkdownDescriptor(self))
+
+    def _save_source(self, sender, instance, **kwargs):
+        # like MonitorField, remember the source the rendition matches
+        if self.attname in instance.get_deferred_fields():
+            return
+        setattr(instance, self.rendered_source_name, instance.__dict__[self.attname])
+
+    def _save_rendered(
+        self, sender, instance, update_fields=None, using=None, **kwargs
+    ):
+        # update_fields naming the source only would drop the rendition
+        if update_fields is None or self.name not in update_fields:
+            return
+        if self.rendered_field_name in update_fields:
+            return
+        rendered = getattr(instance, self.rendered_field_name)
+        sender._base_manager.using(using).filter(pk=instance.pk).update(
+            **{self.rendered_field_name: rendered}
+        )
+
+    def is_rendered(self, model_instance):
+        """Return True if the stored html matches the current source"""
+        content = model_instance.__dict__[self.attname]
+        source = getattr(model_instance, self.rendered_source_name, None)
+        if source != content:
+            return False
+        return not content or bool(getattr(model_instance, self.rendered_field_name))
+
+    def render(self, model_instance):
+        """Render the markdown source of model_instance into its html field"""
+        from coreplus import markdown
+        from coreplus.markdown.plugins.twitter import prefetch_tweets
+
+        content = model_instance.__dict__[self.attname]
+        if self.simple:
+            parse = markdown.parse_simple
+        else:
+            # the html is stored, embed resolved tweets and not placeholders
+            prefetch_tweets(content)
+            parse = markdown.parse
+        # persisted anyway, don't fill the render cache
+        rendered = parse(content, cache=False) if content else ""
+        setattr(model_instance, self.rendered_field_name, rendered)
+        setattr(model_instance, self.rendered_source_name, content)
+        return rendered
+
+    def pre_save(self, model_instance, add):
+        value = super().pre_save(model_instance, add)
+        if add or not self.is_rendered(model_instance):
+            self.render(model_instance)
+        return value.content if value is not None else None
+
+    def value_to_string(self, obj):
+        value = self.value_from_object(obj)
+        return value.content if value is not None else None
+
+    def get_prep_value(self, value):
+        try:
+            return value.content
+        except AttributeError:
+            return value
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs["no_rendered_field"] = True
+        if self.simple:
+            kwargs["simple"] = True
+        return name, path, args, kwargs
+
+
 class UrlsafeTokenField(models.CharField):
     """
     A field for storing a unique token in database.
@@ -0,0 +1,57 @@
+# Generated by Django 4.2 on 2026-10-18 10:37
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Invoice",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "reg_number",
+                    models.PositiveIntegerField(
+                        blank=True, editable=False, null=True, verbose_name="Reg number"
+                    ),
+                ),
+                (
+                    "inner_id",
+                    models.CharField(
+                        blank=True,
+                        editable=False,
+                        max_length=50,
+                        null=True,
+                        unique=True,
+                        verbose_name="Inner ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        editable=False,
+                        verbose_name="created at",
+                    ),
+                ),
+                ("title", models.CharField(blank=True, max_length=100)),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+    ]
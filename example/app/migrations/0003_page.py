@@ -0,0 +1,39 @@
+# Generated by Django 4.2 on 2026-10-18 10:47
+
+import coreplus.utils.models.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0002_invoice"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Page",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("title", models.CharField(max_length=100)),
+                (
+                    "body",
+                    coreplus.utils.models.fields.MarkdownField(
+                        blank=True, no_rendered_field=True
+                    ),
+                ),
+                (
+                    "_body_rendered",
+                    models.TextField(blank=True, default="", editable=False),
+                ),
+            ],
+        ),
+    ]
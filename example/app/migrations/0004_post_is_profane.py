@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18 11:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0003_page"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="is_profane",
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -1,5 +1,20 @@
 from django.db import models
 
+from coreplus.numerators.models import NumeratorMixin
+from coreplus.utils.models.fields import MarkdownField
+
 
 class Post(models.Model):
     content = models.TextField()
+    is_profane = models.BooleanField(default=False)
+
+
+class Invoice(NumeratorMixin):
+    doc_prefix = "INV"
+
+    title = models.CharField(max_length=100, blank=True)
+
+
+class Page(models.Model):
+    title = models.CharField(max_length=100)
+    body = MarkdownField(blank=True)
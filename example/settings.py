@@ -18,6 +18,9 @@ INSTALLED_APPS = [
     "coreplus.numerators",
     "coreplus.navigators",
     "coreplus.markdown",
+    "coreplus.profanity",
+    "coreplus.spams",
+    "coreplus.hooks",
     "coreplus.contacts",
     "coreplus.settings",
     "coreplus",